@@ -1,137 +1,321 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
-from biplot import biplot
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
 
-# ============================================================
-# 1) Chargement du fichier (corrigé)
-# ============================================================
+from schema import load_cleaned
 
-data = pd.read_csv("cleaned_data.csv")  # <<< CORRIGÉ ICI
+# Variables quantitatives utilisées pour l'ACP
+QUANT_COLUMNS = [
+    "frequency listening of emerging artist",
+    "tempo",
+    "frequency during working",
+    "frequency during exercising",
+    "frequency during cooking",
+    "frequency during driving",
+    "frequency for passing the time",
+    "age"
+]
 
-# ============================================================
-# 2) Sélection des variables quantitatives
-# ============================================================
+# Au-delà de ce nombre de points, les nuages sont dessinés en image (raster.py)
+RASTER_MIN_POINTS = 20_000
 
-data_quant = data[[
-    "frequence ecouté artiste émergent", 
-    "tempo", 
-    "fréquence en travaillant", 
-    "fréquence en sport", 
-    "fréquence en cuisine", 
-    "fréquence en transport", 
-    "fréquence en passant le temps", 
-    "age"
-]].dropna()
 
-print(data_quant.columns)
+def eigen_table(explained_variance, explained_variance_ratio):
+    # Tableau des valeurs propres
+    n_compo = len(explained_variance)
+    return pd.DataFrame({
+        "Dimension": ["Dim" + str(x + 1) for x in range(n_compo)],
+        "Valeur Propre": explained_variance,
+        "% valeur propre": np.round(explained_variance_ratio * 100),
+        "% cum. val. prop.": np.round(np.cumsum(explained_variance_ratio) * 100)
+    })
 
-# ============================================================
-# 3) Visualisation : matrice scatterplot
-# ============================================================
 
-sns.pairplot(data_quant)
-plt.show()
+def fit_pca(x, n_compo=5):
+    # ACP complète (sklearn), résultats sous forme de tableaux
+    from sklearn.decomposition import PCA
 
-# ============================================================
-# 4) Standardisation
-# ============================================================
+    pca = PCA(n_components=n_compo)
+    scores = pca.fit_transform(x)
+    return {
+        "components": pca.components_,
+        "explained_variance": pca.explained_variance_,
+        "explained_variance_ratio": pca.explained_variance_ratio_,
+        "scores": scores,
+    }
 
-temp = data_quant.sub(data_quant.mean())
-x_scaled = temp.div(data_quant.std())
-print(x_scaled.shape)
 
-# ============================================================
-# 5) PCA
-# ============================================================
+def compute_analysis(csv_path="cleaned_data.csv"):
+    """Calculs communs à toutes les figures (chargement, ACP, comptages).
 
-n_compo = 5
-pca = PCA(n_components=n_compo)
-pca_res = pca.fit_transform(x_scaled)
+    L'ACP est relue dans cleaned_data.pca/ si les données n'ont pas changé.
+    """
+    from cooccurrence import counts_frame, genre_stats
+    from pca_cache import cached_pca, pca_cache_dir
 
-eig = pd.DataFrame({
-    "Dimension": ["Dim" + str(x + 1) for x in range(n_compo)],
-    "Valeur Propre": pca.explained_variance_,
-    "% valeur propre": np.round(pca.explained_variance_ratio_ * 100),
-    "% cum. val. prop.": np.round(np.cumsum(pca.explained_variance_ratio_) * 100)
-})
+    # ============================================================
+    # 1) Chargement du fichier typé (projection sur les colonnes utiles)
+    # ============================================================
 
-print(eig)
+    data = load_cleaned(columns=QUANT_COLUMNS + ["gender", "music style"], csv_path=csv_path)
 
-# ============================================================
-# 6) Histogramme des variances
-# ============================================================
+    # ============================================================
+    # 2) Sélection des variables quantitatives
+    # ============================================================
 
-y1 = list(pca.explained_variance_ratio_)
-x1 = range(len(y1))
+    data_quant = data[QUANT_COLUMNS].dropna().astype(float)
 
-plt.bar(x1, y1)
-plt.xticks(list(x1), [f"Dim{i+1}" for i in x1])
-plt.xlabel("Principal components")
-plt.ylabel("Explained variance ratio")
-plt.show()
+    print(data_quant.columns)
 
-# ============================================================
-# 7) Biplot PCA
-# ============================================================
+    # ============================================================
+    # 4) Standardisation
+    # ============================================================
 
-biplot(
-    score=pca_res[:220, 0:2],
-    coeff=np.transpose(pca.components_[0:2, :]),
-    cat=data['genre'].iloc[:220],
-    coeff_labels=list(data_quant.columns),
-    density=False
-)
-plt.show()
+    temp = data_quant.sub(data_quant.mean())
+    x_scaled = temp.div(data_quant.std())
+    print(x_scaled.shape)
 
-# ============================================================
-# 8) Scatter PCA Dim1 vs Dim2
-# ============================================================
+    # ============================================================
+    # 5) PCA
+    # ============================================================
+
+    n_compo = 5
+    pca = cached_pca(x_scaled, partial(fit_pca, n_compo=n_compo),
+                     {"method": "pca", "n_components": n_compo}, pca_cache_dir(csv_path))
+
+    eig = eigen_table(pca["explained_variance"], pca["explained_variance_ratio"])
+
+    print(eig)
+
+    # ============================================================
+    # 9) Analyse des genres musicaux (corrigée)
+    # ============================================================
+
+    # Comptages et co-occurrences tirés de la matrice creuse répondants x
+    # genres (cleaned_data.music_style.npz), mis en cache
+    genres = genre_stats(csv_path, "music style", series=data["music style"])
+    genre_counts = counts_frame(genres)
+    print(genre_counts)
+
+    return {
+        "data_quant": data_quant,
+        "gender": data["gender"],
+        "pca_res": pca["scores"],
+        "components": pca["components"],
+        "explained_variance_ratio": pca["explained_variance_ratio"],
+        "genre_counts": genre_counts,
+        "genres": genres,
+    }
 
-pcadf = pd.DataFrame({
-    "Dim1": pca_res[:221, 0],
-    "Dim2": pca_res[:221, 1],
-    "genre": data["genre"][:221]
-})
 
-listVariance = np.round(pca.explained_variance_ratio_ * 100)
+def compute_wide_analysis(csv_path="cleaned_data.csv", n_compo=5):
+    """ACP sur les variables quantitatives + les indicatrices des réponses
+    multiples (genres, plateformes, langues, radios), sans densifier."""
+    from pca_cache import cached_pca, pca_cache_dir
+    from wide_pca import WIDE_MULTIHOT_COLUMNS, build_wide_matrix, randomized_pca
+
+    data_quant = load_cleaned(columns=QUANT_COLUMNS, csv_path=csv_path).dropna().astype(float)
+    x, names = build_wide_matrix(data_quant, csv_path, WIDE_MULTIHOT_COLUMNS)
+    print(x.shape, f"{x.nnz / (x.shape[0] * x.shape[1]):.2%} non nuls")
+
+    params = {"n_components": n_compo, "n_oversamples": 10, "n_iter": 7, "random_state": 0}
+    pca = cached_pca(x, partial(randomized_pca, **params),
+                     dict(params, method="randomized"), pca_cache_dir(csv_path))
+    eig = eigen_table(pca["explained_variance"], pca["explained_variance_ratio"])
+    print(eig)
+
+    return {
+        "feature_names": names,
+        "pca_res": pca["scores"],
+        "components": pca["components"],
+        "explained_variance_ratio": pca["explained_variance_ratio"],
+        "eig": eig,
+    }
 
-pcadf.plot.scatter("Dim1", "Dim2")
-plt.title(f"Variance expliquée : {listVariance[0]} % - {listVariance[1]} %")
-plt.xlabel(f"Dimension 1 ({listVariance[0]}%)")
-plt.ylabel(f"Dimension 2 ({listVariance[1]}%)")
-plt.show()
 
 # ============================================================
-# 9) Analyse des genres musicaux (corrigée)
+# Figures : chaque fonction crée et renvoie sa propre figure
 # ============================================================
+# Une figure ne reçoit que ce qu'elle dessine (FIGURE_INPUTS), pas tout
+# le dictionnaire de compute_analysis : en mode rapport, c'est ce qui est
+# envoyé à chaque processus de rendu.
+
+def scatter_matrix_inputs(res):
+    # Comptages par case (taille fixe) au lieu des lignes
+    from scatter_matrix import binned_counts
+
+    edges, counts = binned_counts(res["data_quant"])
+    return {"columns": list(res["data_quant"].columns), "edges": edges, "counts": counts}
+
+
+def plot_scatter_matrix(inputs):
+    # 3) Visualisation : matrice scatterplot (comptages par case au lieu
+    # de sns.pairplot, coût indépendant du nombre de lignes)
+    from scatter_matrix import draw_binned_scatter_matrix
+
+    return draw_binned_scatter_matrix(inputs["columns"], inputs["edges"], inputs["counts"])
 
-df = pd.read_csv("cleaned_data.csv")  # <<< CORRIGÉ ICI AUSSI
 
-# Découpage + explosion des genres
-df_genres = df.copy()
-df_genres['genre_list'] = df_genres['genre musicale'].str.split(';')
+def variance_inputs(res):
+    return {"explained_variance_ratio": res["explained_variance_ratio"]}
 
-exploded = df_genres.explode('genre_list')
 
-# Comptage
-genre_counts = exploded['genre_list'].value_counts().reset_index()
-genre_counts.columns = ['genre', 'count']
-print(genre_counts)
+def plot_variance(inputs):
+    # 6) Histogramme des variances
+    import matplotlib.pyplot as plt
+
+    y1 = list(inputs["explained_variance_ratio"])
+    x1 = range(len(y1))
+
+    fig = plt.figure()
+    plt.bar(x1, y1)
+    plt.xticks(list(x1), [f"Dim{i+1}" for i in x1])
+    plt.xlabel("Principal components")
+    plt.ylabel("Explained variance ratio")
+    return fig
+
+
+def biplot_inputs(res):
+    # Deux premières coordonnées et genre (catégoriel : codes sur 1 octet)
+    return {
+        "score": np.ascontiguousarray(res["pca_res"][:, 0:2]),
+        "coeff": np.transpose(res["components"][0:2, :]),
+        "gender": res["gender"].loc[res["data_quant"].index].astype("category").reset_index(drop=True),
+        "labels": list(res["data_quant"].columns),
+    }
+
+
+def plot_biplot(inputs):
+    # 7) Biplot PCA
+    import matplotlib.pyplot as plt
+    from biplot import biplot
+
+    biplot(
+        score=inputs["score"],
+        coeff=inputs["coeff"],
+        cat=inputs["gender"],
+        coeff_labels=inputs["labels"],
+        density=False,
+        show=False,
+        raster=len(inputs["score"]) >= RASTER_MIN_POINTS
+    )
+    return plt.gcf()
+
+
+def pca_scatter_inputs(res):
+    return {
+        "score": np.ascontiguousarray(res["pca_res"][:, 0:2]),
+        "explained_variance_ratio": res["explained_variance_ratio"],
+    }
+
+
+def plot_pca_scatter(inputs):
+    # 8) Scatter PCA Dim1 vs Dim2
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import to_rgba
+    from raster import draw_raster
+
+    score = inputs["score"]
+    pcadf = pd.DataFrame({"Dim1": score[:, 0], "Dim2": score[:, 1]})
+
+    listVariance = np.round(inputs["explained_variance_ratio"] * 100)
+
+    if len(pcadf) >= RASTER_MIN_POINTS:
+        # Beaucoup de répondants : une image au lieu d'un marqueur par point
+        fig, ax = plt.subplots()
+        draw_raster(ax, pcadf["Dim1"], pcadf["Dim2"], np.zeros(len(pcadf), dtype=int), [to_rgba("C0")])
+    else:
+        ax = pcadf.plot.scatter("Dim1", "Dim2")
+    plt.title(f"Variance expliquée : {listVariance[0]} % - {listVariance[1]} %")
+    plt.xlabel(f"Dimension 1 ({listVariance[0]}%)")
+    plt.ylabel(f"Dimension 2 ({listVariance[1]}%)")
+    return ax.figure
+
+
+def genre_counts_inputs(res):
+    return {"genre_counts": res["genre_counts"]}
+
+
+def plot_genre_counts(inputs):
+    # 10) Graphique des genres ordonnés
+    import matplotlib.pyplot as plt
+
+    sorted_counts = inputs["genre_counts"].sort_values('count')
+
+    fig = plt.figure(figsize=(12, 10))
+    plt.barh(sorted_counts['genre'], sorted_counts['count'])
+    plt.xlabel('Number of mentions')
+    plt.ylabel('Music styles')
+    plt.title("Interest in music styles (number of mentions)")
+    plt.tight_layout()
+    return fig
+
+
+FIGURES = {
+    "scatter_matrix": plot_scatter_matrix,
+    "variance": plot_variance,
+    "biplot": plot_biplot,
+    "pca_scatter": plot_pca_scatter,
+    "genre_counts": plot_genre_counts,
+}
+
+FIGURE_INPUTS = {
+    "scatter_matrix": scatter_matrix_inputs,
+    "variance": variance_inputs,
+    "biplot": biplot_inputs,
+    "pca_scatter": pca_scatter_inputs,
+    "genre_counts": genre_counts_inputs,
+}
+
+
+def analyse(csv_path="cleaned_data.csv"):
+    # Mode interactif : affiche les figures une par une
+    import matplotlib.pyplot as plt
+
+    res = compute_analysis(csv_path)
+    for name, plot in FIGURES.items():
+        plot(FIGURE_INPUTS[name](res))
+        plt.show()
+
 
 # ============================================================
-# 10) Graphique des genres ordonnés
+# Mode rapport : toutes les figures en fichiers, sans affichage
 # ============================================================
 
-sorted_counts = genre_counts.sort_values('count')
+def _render_figure(name, inputs, path):
+    # Backend non interactif, choisi avant le premier import de pyplot
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig = FIGURES[name](inputs)
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def render_report(csv_path="cleaned_data.csv", out_dir="figures", workers=None, fmt="png"):
+    """Écrit chaque figure dans out_dir, rendues en parallèle.
+
+    Les calculs sont faits une seule fois ; chaque figure est ensuite
+    dessinée dans son propre processus : la durée totale est proche de
+    celle de la figure la plus lente. Chaque processus ne reçoit que les
+    entrées de sa figure (FIGURE_INPUTS), pas les données complètes.
+    """
+    res = compute_analysis(csv_path)
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or min(len(FIGURES), os.cpu_count())
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(_render_figure, name, FIGURE_INPUTS[name](res), os.path.join(out_dir, f"{name}.{fmt}"))
+                for name in FIGURES]
+        paths = [job.result() for job in jobs]
+    for path in paths:
+        print(f"{path} created successfully ✅")
+    return paths
+
 
-plt.figure(figsize=(12, 10))
-plt.barh(sorted_counts['genre'], sorted_counts['count'])
-plt.xlabel('Number of mentions')
-plt.ylabel('Music styles')
-plt.title("Interest in music styles (number of mentions)")
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    analyse()
@@ -0,0 +1,49 @@
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ingest import read_survey
+from normalize import ABSURD_GENRES, is_absurd_genre
+
+# =============================================================
+# Micro-benchmark : filtre des genres absurdes
+# =============================================================
+# re.search par token (ancienne version) vs automate unique appliqué au
+# vocabulaire distinct puis rediffusé sur les tokens.
+#   python benchmarks/bench_absurd_filter.py [N tokens]
+
+N_TOKENS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+RAW = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "raw_data.csv")
+
+
+def load_tokens(n_tokens):
+    genres = read_survey(RAW, names=["music style"])["music style"].dropna()
+    tokens = genres.str.lower().str.split(r'\s*[\/,;]\s*').explode().str.strip()
+    rng = np.random.default_rng(0)
+    return tokens.to_numpy()[rng.integers(0, len(tokens), n_tokens)]
+
+
+if __name__ == "__main__":
+    tokens = load_tokens(N_TOKENS)
+    pattern = "(" + "|".join(re.escape(m) for m in ABSURD_GENRES) + ")"
+
+    t0 = time.perf_counter()
+    old = np.array([re.search(pattern, g, flags=re.IGNORECASE) is not None for g in tokens])
+    t1 = time.perf_counter()
+    codes, vocab = pd.factorize(tokens)
+    new = np.array([is_absurd_genre(g) for g in vocab])[codes]
+    t2 = time.perf_counter()
+    one_by_one = np.array([is_absurd_genre(g) for g in tokens])
+    t3 = time.perf_counter()
+
+    assert (old == new).all() and (old == one_by_one).all()
+    print(f"{N_TOKENS} tokens, {len(vocab)} distincts, {old.sum()} supprimés")
+    print(f"re.search par token      : {t1 - t0:6.2f}s")
+    print(f"automate par token       : {t3 - t2:6.2f}s")
+    print(f"automate sur vocabulaire : {t2 - t1:6.2f}s")
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import ConvexHull
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import matplotlib
+matplotlib.use("Agg")
+
+from biplot import biplot, category_hulls
+
+# =============================================================
+# Micro-benchmark : enveloppes convexes du biplot (mode BigData)
+# =============================================================
+# Listes en compréhension par catégorie (ancienne version, O(n x
+# catégories)) vs un tri sur les codes + enveloppes en parallèle ;
+# sns.kdeplot par catégorie vs KDE binnée sur grille (mode density).
+# Les anciennes versions ne sont mesurées que sur N_OLD lignes.
+#   python benchmarks/bench_biplot.py [N lignes] [N catégories]
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+N_CATS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+N_OLD = min(N_ROWS, 20_000)
+
+
+def old_hulls(x_c, y_c, cat):
+    hulls = []
+    for cat_temp in cat.cat.codes.unique():
+        x_c_temp = [x_c[i] for i in range(len(x_c)) if (cat.cat.codes[i] == cat_temp)]
+        y_c_temp = [y_c[i] for i in range(len(y_c)) if (cat.cat.codes[i] == cat_temp)]
+        points = np.column_stack([x_c_temp, y_c_temp])
+        hulls.append((cat_temp, points[ConvexHull(points).simplices]))
+    return hulls
+
+
+def old_density(score, cat):
+    import seaborn as sns
+    data = pd.DataFrame({"x_c": score[:, 0], "y_c": score[:, 1]})
+    sns.kdeplot(x="x_c", y="y_c", data=data)
+    for i in np.unique(cat):
+        sns.kdeplot(x="x_c", y="y_c", data=data[cat == i], fill=True, thresh=0.25, alpha=0.25)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    score = rng.normal(size=(N_ROWS, 2))
+    cat = pd.Series(rng.integers(0, N_CATS, N_ROWS)).map(lambda i: f"genre {i}").astype("category")
+
+    t0 = time.perf_counter()
+    old = dict(old_hulls(score[:N_OLD, 0], score[:N_OLD, 1], cat[:N_OLD]))
+    t1 = time.perf_counter()
+    new = dict(category_hulls(score[:N_OLD, 0], score[:N_OLD, 1], cat[:N_OLD].cat.codes.to_numpy()))
+    t2 = time.perf_counter()
+    category_hulls(score[:, 0], score[:, 1], cat.cat.codes.to_numpy())
+    t3 = time.perf_counter()
+    biplot(score=score, cat=cat, density=False, show=False)
+    t4 = time.perf_counter()
+    old_density(score[:N_OLD], cat[:N_OLD])
+    t5 = time.perf_counter()
+    biplot(score=score, cat=cat, density=True, show=False)
+    t6 = time.perf_counter()
+
+    assert old.keys() == new.keys()
+    assert all(len(old[k]) == len(new[k]) for k in old)
+    print(f"{N_ROWS} lignes, {N_CATS} catégories")
+    print(f"compréhensions ({N_OLD} lignes) : {t1 - t0:6.2f}s")
+    print(f"tri + parallèle ({N_OLD} lignes): {t2 - t1:6.2f}s")
+    print(f"tri + parallèle ({N_ROWS} lignes): {t3 - t2:6.2f}s")
+    print(f"biplot complet ({N_ROWS} lignes): {t4 - t3:6.2f}s")
+    print(f"sns.kdeplot ({N_OLD} lignes)    : {t5 - t4:6.2f}s")
+    print(f"density grille ({N_ROWS} lignes): {t6 - t5:6.2f}s")
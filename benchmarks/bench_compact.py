@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cleaner import read_raw, data_clean
+from schema import COMPACT_TYPES
+
+# =============================================================
+# Benchmark : mémoire du DataFrame nettoyé (types compacts vs object)
+# =============================================================
+# N lignes tirées de raw_data.csv, nettoyées par data_clean (types
+# compacts, voir schema.py), puis comparées au même DataFrame en colonnes
+# object / float64 comme avant. La mémoire compte les tableaux de la
+# trame (8 octets par cellule object) : les chaînes elles-mêmes sont
+# partagées entre les lignes et ne comptent qu'une fois.
+#   python benchmarks/bench_compact.py [N lignes]
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+RAW = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "raw_data.csv")
+
+
+def legacy_types(data):
+    # Types qu'avait le DataFrame nettoyé avant schema.COMPACT_TYPES
+    legacy = {}
+    for col in data.columns:
+        kind = COMPACT_TYPES[col]
+        legacy[col] = data[col].astype("float64") if kind in ("Int8", "float32") else data[col].astype(object)
+    return pd.DataFrame(legacy)
+
+
+if __name__ == "__main__":
+    raw = read_raw(RAW)
+    rng = np.random.default_rng(0)
+    sample = raw.iloc[rng.integers(0, len(raw), N_ROWS)].reset_index(drop=True)
+
+    t0 = time.perf_counter()
+    compact = data_clean(sample, output=None)
+    elapsed = time.perf_counter() - t0
+    del sample
+    legacy = legacy_types(compact)
+
+    compact_mb = compact.memory_usage(index=False).sum() / 2 ** 20
+    legacy_mb = legacy.memory_usage(index=False).sum() / 2 ** 20
+    print(f"{N_ROWS} lignes, nettoyage {elapsed:.2f}s")
+    print(f"object / float64 : {legacy_mb:8.0f} Mo")
+    print(f"types compacts   : {compact_mb:8.0f} Mo   (/{legacy_mb / compact_mb:.1f})")
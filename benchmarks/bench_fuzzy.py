@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fuzzy import bounded_distance, compile_matcher, fold
+
+# =============================================================
+# Benchmark : rapprochement approché des tokens (fuzzy.py)
+# =============================================================
+# Vocabulaire de V motifs (mots de 2 à 4 syllabes tirés au hasard) et
+# N tokens à rapprocher : motifs du vocabulaire avec une faute (lettre
+# ajoutée, supprimée, remplacée, inversée, accent) ou tokens inconnus.
+#   - index par bigrammes : compile_matcher
+#   - comparaison de chaque token à tout le vocabulaire (N x V distances),
+#     mesurée sur un échantillon puis extrapolée
+# Vérifie que les deux donnent la même valeur sur l'échantillon.
+#   python benchmarks/bench_fuzzy.py [V motifs] [N tokens]
+
+N_VOCAB = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+N_TOKENS = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+THRESHOLD = 0.8
+SAMPLE = 200
+
+SYLLABLES = ["ro", "ck", "tek", "no", "pop", "ja", "zz", "mé", "tal", "fo", "lk", "ra", "p", "él", "ec", "tro",
+             "sou", "l", "blu", "es", "fun", "k", "reg", "gae", "ho", "use", "dub", "step", "tran", "ce", "vari",
+             "été", "chan", "son", "fran", "çai", "se", "you", "tu", "be", "spo", "ti", "fy", "dee", "zer"]
+LETTERS = "abcdefghijklmnopqrstuvwxyzéè "
+
+
+def word(rng):
+    n = rng.integers(2, 5)
+    return "".join(SYLLABLES[i] for i in rng.integers(0, len(SYLLABLES), n))
+
+
+def typo(rng, text):
+    i = int(rng.integers(0, len(text)))
+    kind = rng.integers(0, 5)
+    letter = LETTERS[rng.integers(0, len(LETTERS))]
+    if kind == 0:
+        return text[:i] + letter + text[i:]
+    if kind == 1:
+        return text[:i] + text[i + 1:]
+    if kind == 2:
+        return text[:i] + letter + text[i + 1:]
+    if kind == 3 and i + 1 < len(text):
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return fold(text)
+
+
+def brute_force(vocabulary, token):
+    # Référence : distance à chaque motif, même règle de choix
+    token = fold(token)
+    best, best_rank = None, None
+    for pattern, priority, value in vocabulary:
+        key = fold(pattern)
+        longest = max(len(token), len(key))
+        k = int((1 - THRESHOLD) * longest + 1e-9)
+        d = bounded_distance(token, key, k)
+        if d <= k and (best_rank is None or (d, priority, key) < best_rank):
+            best, best_rank = value, (d, priority, key)
+    return best
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    patterns = list(dict.fromkeys(word(rng) for _ in range(N_VOCAB)))
+    vocabulary = [(p, i, f"v{i}") for i, p in enumerate(patterns)]
+    tokens = [typo(rng, patterns[rng.integers(0, len(patterns))]) if rng.random() < 0.8 else word(rng)
+              for _ in range(N_TOKENS)]
+    tokens = list(dict.fromkeys(tokens))
+    print(f"{len(vocabulary)} motifs, {len(tokens)} tokens distincts, seuil {THRESHOLD}")
+
+    t0 = time.perf_counter()
+    match = compile_matcher(vocabulary, THRESHOLD)
+    t1 = time.perf_counter()
+    values = [match(t) for t in tokens]
+    t2 = time.perf_counter()
+    found = sum(v is not None for v in values)
+    print(f"index      : {t1 - t0:6.2f}s")
+    print(f"rapprochés : {t2 - t1:6.2f}s   ({found} tokens rapprochés)")
+
+    sample = tokens[:SAMPLE]
+    t3 = time.perf_counter()
+    expected = [brute_force(vocabulary, t) for t in sample]
+    t4 = time.perf_counter()
+    assert expected == values[:SAMPLE]
+    estimate = (t4 - t3) / SAMPLE * len(tokens)
+    print(f"N x V      : {estimate:6.0f}s (estimé sur {SAMPLE} tokens)   x{estimate / (t2 - t0):.0f}")
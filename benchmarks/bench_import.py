@@ -0,0 +1,59 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# =============================================================
+# Benchmark : temps d'import et démarrage à froid
+# =============================================================
+# Chaque mesure se fait dans un nouvel interpréteur (meilleur de R essais).
+#   python benchmarks/bench_import.py [R]
+
+REPEAT = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY = ["matplotlib", "seaborn", "sklearn"]
+
+IMPORT_SNIPPET = """
+import sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy) or "-")
+"""
+
+
+def time_import(module):
+    best, heavy = None, None
+    for _ in range(REPEAT):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET.format(module=module, heavy=HEAVY)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        best = float(out[0]) if best is None else min(best, float(out[0]))
+        heavy = out[1]
+    return best, heavy
+
+
+def time_command(args, cwd):
+    best = None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=cwd, capture_output=True, check=True)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    print("import (sans effet de bord attendu)")
+    for module in ["normalize", "cleaner", "analyse", "cli"]:
+        elapsed, heavy = time_import(module)
+        print(f"  {module:<10} {elapsed * 1000:7.0f} ms   modules lourds chargés : {heavy}")
+
+    print("démarrage à froid")
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(os.path.join(ROOT, "raw_data.csv"), tmp)
+        cli = os.path.join(ROOT, "cli.py")
+        print(f"  cli.py --help  {time_command([cli, '--help'], tmp) * 1000:7.0f} ms")
+        print(f"  cli.py clean   {time_command([cli, 'clean'], tmp) * 1000:7.0f} ms")
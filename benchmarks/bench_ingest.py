@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ingest import RAW_NAMES, has_arrow, read_survey
+from synthetic import write_survey
+
+# =============================================================
+# Benchmark : lecture de l'export brut
+# =============================================================
+# Export synthétique de N lignes (29 colonnes, synthetic.py), lu :
+#   - comme avant : pd.read_csv(usecols=range(3, 23)) puis noms par position
+#   - par ingest.read_survey : questions repérées par leur intitulé,
+#     pyarrow multithread, seules les 20 questions analysées sont lues
+# Vérifie que les deux lectures donnent les mêmes valeurs.
+#   python benchmarks/bench_ingest.py [N lignes]
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_ingest_"), "raw.csv")
+    write_survey(path, N_ROWS)
+    print(f"{N_ROWS} lignes, {os.path.getsize(path) / 2 ** 20:.0f} Mo, {os.cpu_count()} coeurs, "
+          f"pyarrow {'oui' if has_arrow() else 'non'}")
+
+    t0 = time.perf_counter()
+    old = pd.read_csv(path, usecols=range(3, 23))
+    old.columns = RAW_NAMES
+    t1 = time.perf_counter()
+    new = read_survey(path)
+    t2 = time.perf_counter()
+    pd.testing.assert_frame_equal(old, new)
+
+    print(f"read_csv par position : {t1 - t0:6.2f}s")
+    print(f"read_survey           : {t2 - t1:6.2f}s   x{(t1 - t0) / (t2 - t1):.1f}")
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from neighbours import add_to_index, build_index, fit_embedding, query_index, similar_respondents
+
+# =============================================================
+# Micro-benchmark : index "des gens comme vous"
+# =============================================================
+# Plongement ajusté sur cleaned_data.csv, puis N répondants simulés
+# (répondants réels tirés au hasard + bruit). Mesure la construction de
+# l'arbre, les requêtes par lots (approchées puis exactes) et les
+# insertions incrémentales ; vérifie les voisins exacts contre une
+# recherche exhaustive sur un échantillon.
+#   python benchmarks/bench_neighbours.py [N répondants] [k]
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+K = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+N_QUERIES = 10_000
+N_INSERTS = 5_000
+CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cleaned_data.csv")
+
+
+if __name__ == "__main__":
+    model, real = fit_embedding(CSV)
+    rng = np.random.default_rng(0)
+    noise = 0.3 * real.std(axis=0)
+    emb = (real[rng.integers(0, len(real), N_ROWS)] + rng.normal(size=(N_ROWS, real.shape[1])) * noise).astype(np.float32)
+    new = (real[rng.integers(0, len(real), N_INSERTS)] + rng.normal(size=(N_INSERTS, real.shape[1])) * noise).astype(np.float32)
+
+    t0 = time.perf_counter()
+    index = build_index(emb)
+    t1 = time.perf_counter()
+    ids = rng.integers(0, N_ROWS, N_QUERIES)
+    dist, found = similar_respondents(index, ids, K)
+    t2 = time.perf_counter()
+    for start in range(0, N_INSERTS, 500):
+        add_to_index(index, new[start:start + 500])
+    t3 = time.perf_counter()
+    dist2, found2 = query_index(index, emb[ids], K)
+    t4 = time.perf_counter()
+    dist3, found3 = query_index(index, emb[ids], K, eps=0)
+    t5 = time.perf_counter()
+
+    # Contrôle exhaustif sur quelques requêtes (arbre + tampon)
+    everything = np.vstack([emb, new])
+    for q in range(20):
+        d = np.sqrt(((everything - emb[ids[q]]) ** 2).sum(axis=1))
+        assert np.allclose(np.sort(d)[:K], dist3[q], atol=1e-4)
+    recall = np.mean([len(set(a) & set(b)) / K for a, b in zip(found2, found3)])
+
+    print(f"{N_ROWS} répondants, {emb.shape[1]} dimensions, k = {K}")
+    print(f"construction de l'arbre        : {t1 - t0:6.2f}s")
+    print(f"{N_QUERIES} requêtes (voisins)     : {t2 - t1:6.2f}s  ({(t2 - t1) / N_QUERIES * 1e3:.3f} ms/requête)")
+    print(f"{N_INSERTS} insertions (lots de 500) : {t3 - t2:6.2f}s")
+    print(f"après insertions, approchée    : {t4 - t3:6.2f}s  ({(t4 - t3) / N_QUERIES * 1e3:.3f} ms/requête)")
+    print(f"après insertions, exacte       : {t5 - t4:6.2f}s  ({(t5 - t4) / N_QUERIES * 1e3:.3f} ms/requête)")
+    print(f"rappel de la recherche approchée : {recall:.1%}")
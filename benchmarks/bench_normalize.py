@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ingest import read_survey
+from normalize import (normalize_multi_valued, normalize_platform, normalize_language,
+                       normalize_musical_period, normalize_genre)
+
+# =============================================================
+# Benchmark : apply() cellule par cellule vs moteur vectorisé
+# =============================================================
+# Les réponses de raw_data.csv sont tirées au hasard jusqu'à N lignes.
+#   python benchmarks/bench_normalize.py [N]
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+RAW = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "raw_data.csv")
+
+COLUMNS = {
+    "platform listening": normalize_platform,
+    "music style": normalize_genre,
+    "musical period": normalize_musical_period,
+    "language listening": normalize_language,
+}
+
+
+def legacy_apply(value, normalize_token):
+    # Ancienne version : une fonction Python par cellule
+    if not isinstance(value, str):
+        return np.nan
+    normalized = []
+    for g in [g.strip() for g in value.split(";")]:
+        ng = normalize_token(g)
+        if ng:
+            normalized.append(ng)
+    normalized = list(dict.fromkeys(normalized))
+    return ";".join(normalized) if normalized else np.nan
+
+
+def load_sample(n_rows):
+    raw = read_survey(RAW, names=list(COLUMNS))
+    raw = raw.apply(lambda s: s.str.replace(r'\s*[\/,;]\s*', ';', regex=True).str.strip().str.lower())
+    rng = np.random.default_rng(0)
+    return raw.iloc[rng.integers(0, len(raw), n_rows)].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    sample = load_sample(N_ROWS)
+    print(f"{N_ROWS} lignes")
+    for col, fn in COLUMNS.items():
+        t0 = time.perf_counter()
+        old = sample[col].apply(legacy_apply, args=(fn,))
+        t1 = time.perf_counter()
+        new = normalize_multi_valued(sample[col], fn)
+        t2 = time.perf_counter()
+        assert old.equals(new.astype(object)), col
+        print(f"{col:<20} apply: {t1 - t0:6.2f}s   vectorisé: {t2 - t1:6.2f}s   x{(t1 - t0) / (t2 - t1):.1f}")
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cleaner import read_raw, data_clean, data_clean_parallel
+
+# =============================================================
+# Benchmark : data_clean séquentiel vs data_clean_parallel
+# =============================================================
+# Les réponses de raw_data.csv sont tirées au hasard jusqu'à N lignes,
+# puis nettoyées avec 1 à W processus.
+#   python benchmarks/bench_parallel.py [N] [W]
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+MAX_WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+RAW = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "raw_data.csv")
+
+
+def load_sample(n_rows):
+    raw = read_raw(RAW)
+    rng = np.random.default_rng(0)
+    return raw.iloc[rng.integers(0, len(raw), n_rows)].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    sample = load_sample(N_ROWS)
+    print(f"{N_ROWS} lignes, {os.cpu_count()} coeurs")
+
+    t0 = time.perf_counter()
+    serial = data_clean(sample.copy(), output=None, impute_age=True)
+    serial_time = time.perf_counter() - t0
+    print(f"séquentiel     : {serial_time:6.2f}s")
+
+    for workers in range(1, MAX_WORKERS + 1):
+        t0 = time.perf_counter()
+        parallel = data_clean_parallel(sample.copy(), workers=workers, output=None, impute_age=True)
+        elapsed = time.perf_counter() - t0
+        pd.testing.assert_frame_equal(serial, parallel)
+        print(f"{workers:2d} processus   : {elapsed:6.2f}s   x{serial_time / elapsed:.2f}")
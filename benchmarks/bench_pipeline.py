@@ -0,0 +1,221 @@
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# =============================================================
+# Benchmark de toute la chaîne sur des données synthétiques
+# =============================================================
+# Pour chaque taille : génération (synthetic.py), lecture, nettoyage en
+# mémoire, nettoyage par morceaux, ACP, ACP large creuse, biplot, rapport.
+# Chaque étape tourne dans un processus neuf : on mesure sa durée et le pic
+# de mémoire (RSS) du processus, ainsi que la mémoire ajoutée par l'étape
+# elle-même (pic - RSS au début de la partie chronométrée).
+#
+#   python benchmarks/bench_pipeline.py 10000 100000 1000000 [--output res.json]
+#   python benchmarks/bench_pipeline.py 100000 --baseline res.json
+#
+# L'étape "incremental" mesure l'ajout de la seconde moitié des réponses
+# par clean --incremental, puis vérifie que la sortie garde le bon nombre
+# de lignes quand un autre mode la réécrit entre deux ajouts.
+#
+# Avec --baseline, chaque étape est comparée au résultat enregistré ; une
+# étape plus lente de plus de --tolerance (défaut 20 %) est signalée.
+
+
+def _rss_mb():
+    # RSS courant (Linux), en Mo
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def _peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Chaque étape prépare ce dont elle a besoin, puis appelle timed(fonction)
+# pour la partie mesurée
+
+def stage_generate(work, n_rows, timed):
+    from synthetic import write_survey
+    timed(lambda: write_survey(os.path.join(work, "raw.csv"), n_rows))
+
+
+def stage_read(work, n_rows, timed):
+    from cleaner import read_raw
+    timed(lambda: read_raw(os.path.join(work, "raw.csv")))
+
+
+def stage_clean(work, n_rows, timed):
+    from cleaner import data_clean, read_raw
+    data = read_raw(os.path.join(work, "raw.csv"))
+    timed(lambda: data_clean(data, output=os.path.join(work, "cleaned_data.csv"), impute_age=True))
+
+
+def stage_stream(work, n_rows, timed):
+    from cleaner import clean_stream
+    timed(lambda: clean_stream(os.path.join(work, "raw.csv"), os.path.join(work, "stream", "cleaned_data.csv"),
+                               impute_age=True))
+
+
+def stage_incremental(work, n_rows, timed):
+    import pandas as pd
+    from cleaner import clean_incremental, clean_stream
+    from multihot import MULTI_VALUED_COLUMNS, load_multihot, multihot_path
+    from schema import load_cleaned
+
+    raw = pd.read_csv(os.path.join(work, "raw.csv"), dtype=str, keep_default_na=False)
+    raw_path = os.path.join(work, "incremental", "raw.csv")
+    other_path = os.path.join(work, "incremental", "other.csv")
+    output = os.path.join(work, "incremental", "cleaned_data.csv")
+
+    def write_raw(path, n):
+        raw.iloc[:n].to_csv(path, index=False, quoting=csv.QUOTE_ALL)
+
+    def check_rows(n):
+        # CSV, Parquet et matrices multi-hot
+        counts = [len(pd.read_csv(output, usecols=["age"])), len(load_cleaned(["age"], output))]
+        counts += [load_multihot(multihot_path(output, col))[0].shape[0] for col in MULTI_VALUED_COLUMNS]
+        assert counts == [n] * len(counts), counts
+
+    write_raw(raw_path, n_rows // 2)
+    clean_incremental(raw_path, output)
+    write_raw(raw_path, n_rows)
+    timed(lambda: clean_incremental(raw_path, output))
+    check_rows(n_rows)
+
+    # Sortie réécrite par un autre mode entre deux ajouts : reconstruction
+    # complète, pas de lignes en double ni de "déjà à jour"
+    write_raw(raw_path, n_rows // 2)
+    clean_incremental(raw_path, output)
+    write_raw(raw_path, n_rows)
+    clean_stream(raw_path, output)
+    clean_incremental(raw_path, output)
+    check_rows(n_rows)
+    write_raw(other_path, 1)
+    clean_stream(other_path, output)
+    clean_incremental(raw_path, output)
+    check_rows(n_rows)
+
+
+def stage_analyse(work, n_rows, timed):
+    from analyse import compute_analysis
+    timed(lambda: compute_analysis(os.path.join(work, "cleaned_data.csv")))
+
+
+def stage_wide_pca(work, n_rows, timed):
+    from analyse import compute_wide_analysis
+    timed(lambda: compute_wide_analysis(os.path.join(work, "cleaned_data.csv")))
+
+
+def stage_biplot(work, n_rows, timed):
+    from analyse import _render_figure, biplot_inputs, compute_analysis
+    res = compute_analysis(os.path.join(work, "cleaned_data.csv"))
+    timed(lambda: _render_figure("biplot", biplot_inputs(res), os.path.join(work, "biplot.png")))
+
+
+def stage_report(work, n_rows, timed):
+    from analyse import render_report
+    timed(lambda: render_report(os.path.join(work, "cleaned_data.csv"), os.path.join(work, "figures"), workers=1))
+
+
+STAGES = {
+    "generate": stage_generate,
+    "read": stage_read,
+    "clean": stage_clean,
+    "stream": stage_stream,
+    "incremental": stage_incremental,
+    "analyse": stage_analyse,
+    "wide_pca": stage_wide_pca,
+    "biplot": stage_biplot,
+    "report": stage_report,
+}
+
+
+def _run_stage(name, work, n_rows):
+    # Exécuté dans un processus neuf
+    import matplotlib
+    matplotlib.use("Agg")
+    result = {}
+
+    def timed(fn):
+        result["rss_start_mb"] = _rss_mb()
+        t0, c0 = time.perf_counter(), time.process_time()
+        fn()
+        result["wall_s"] = time.perf_counter() - t0
+        result["cpu_s"] = time.process_time() - c0
+
+    os.makedirs(os.path.join(work, "stream"), exist_ok=True)
+    os.makedirs(os.path.join(work, "incremental"), exist_ok=True)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        STAGES[name](work, n_rows, timed)
+    result["peak_mb"] = _peak_mb()
+    result["added_mb"] = max(result["peak_mb"] - result["rss_start_mb"], 0)
+    return result
+
+
+def run(sizes, stages):
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for n_rows in sizes:
+        work = tempfile.mkdtemp(prefix=f"bench_{n_rows}_")
+        try:
+            results[str(n_rows)] = {}
+            for name in stages:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    res = pool.submit(_run_stage, name, work, n_rows).result()
+                results[str(n_rows)][name] = res
+                print(f"{n_rows:>10} {name:<11} {res['wall_s']:8.2f}s  cpu {res['cpu_s']:8.2f}s  "
+                      f"pic {res['peak_mb']:8.0f} Mo  (+{res['added_mb']:.0f} Mo)", flush=True)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Liste des étapes plus lentes que la référence de plus de `tolerance`."""
+    regressions = []
+    for size, stages in results.items():
+        for name, res in stages.items():
+            old = baseline.get(size, {}).get(name)
+            if old is None:
+                continue
+            ratio = res["wall_s"] / max(old["wall_s"], 1e-9)
+            mem_ratio = res["peak_mb"] / max(old["peak_mb"], 1e-9)
+            flag = ratio > 1 + tolerance or mem_ratio > 1 + tolerance
+            print(f"{size:>10} {name:<11} temps x{ratio:5.2f}  mémoire x{mem_ratio:5.2f}{'  <- régression' if flag else ''}")
+            if flag:
+                regressions.append((size, name))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la chaîne complète sur données synthétiques")
+    parser.add_argument("sizes", type=int, nargs="*", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--output", help="enregistre les résultats (JSON)")
+    parser.add_argument("--baseline", help="résultats de référence (JSON) à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} coeurs")
+    # Les autres étapes ont besoin de l'export brut et des données nettoyées
+    stages = [name for name in STAGES if name in args.stages or name in ("generate", "clean")]
+    results = run(args.sizes, stages)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        sys.exit(1 if regressions else 0)
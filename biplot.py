@@ -1,4 +1,7 @@
-from scipy.spatial import ConvexHull
+from concurrent.futures import ThreadPoolExecutor
+
+from scipy.signal import fftconvolve
+from scipy.spatial import ConvexHull, QhullError
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
 
@@ -7,14 +10,101 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import matplotlib as mpl
 import matplotlib.cm as cm
+from matplotlib.collections import LineCollection
 import numpy as np
 
+from raster import draw_raster
+
+def _hull_segments(points):
+    # Segments (m, 2, 2) de l'enveloppe convexe d'un nuage de points
+    # (aucun si les points sont confondus ou alignés)
+    if len(points) < 3 : return np.empty((0,2,2))
+    try :
+        return points[ConvexHull(points).simplices]
+    except QhullError :
+        return np.empty((0,2,2))
+
+def category_hulls(x_c,y_c,codes,workers=None):
+    """Enveloppes convexes par catégorie : [(code, segments), ...].
+
+    Un seul tri sur les codes découpe le nuage en blocs contigus ; les
+    enveloppes sont calculées en parallèle (Qhull libère le GIL).
+    """
+    order = np.argsort(codes, kind="stable")
+    codes_sorted = codes[order]
+    points = np.column_stack([np.asarray(x_c,dtype=float), np.asarray(y_c,dtype=float)])[order]
+    uniques, starts = np.unique(codes_sorted, return_index=True)
+    blocks = np.split(points, starts[1:])
+    with ThreadPoolExecutor(max_workers=workers) as pool :
+        hulls = list(pool.map(_hull_segments, blocks))
+    return list(zip(uniques, hulls))
+
+def _gaussian_kernel(sigma_x,sigma_y):
+    # Noyau gaussien 2D discret, tronqué à 4 écarts-types (en cases)
+    sigma_x, sigma_y = max(sigma_x,1e-3), max(sigma_y,1e-3)
+    gx = np.arange(-int(np.ceil(4*sigma_x)), int(np.ceil(4*sigma_x))+1) / sigma_x
+    gy = np.arange(-int(np.ceil(4*sigma_y)), int(np.ceil(4*sigma_y))+1) / sigma_y
+    r2 = gx[None,:]**2 + gy[:,None]**2
+    k = np.where(r2 <= 16, np.exp(-0.5 * r2), 0)
+    return k / k.sum()
+
+def grid_kde(x_c,y_c,codes,gridsize=200,lim=1.2):
+    """KDE gaussienne binnée sur la grille [-lim, lim]² : (centres, densité
+    du nuage entier, {code: densité de la catégorie}).
+
+    Les points sont comptés une seule fois par case et par catégorie (un
+    bincount), puis chaque grille est lissée par convolution FFT. Largeur
+    de bande : règle de Scott par axe, comme gaussian_kde.
+    """
+    x_c = np.asarray(x_c,dtype=float)
+    y_c = np.asarray(y_c,dtype=float)
+    step = 2 * lim / gridsize
+    centers = -lim + step * (np.arange(gridsize) + 0.5)
+    ix = np.clip(((x_c + lim) / step).astype(int), 0, gridsize-1)
+    iy = np.clip(((y_c + lim) / step).astype(int), 0, gridsize-1)
+    uniques, inverse = np.unique(codes, return_inverse=True)
+    cells = gridsize * gridsize
+    counts = np.bincount(inverse * cells + iy * gridsize + ix,
+                         minlength=len(uniques) * cells).reshape(len(uniques), gridsize, gridsize)
+    # Moyennes et variances par catégorie, sans masque
+    n = np.bincount(inverse, minlength=len(uniques)).astype(float)
+    sx = np.bincount(inverse, weights=x_c, minlength=len(uniques))
+    sy = np.bincount(inverse, weights=y_c, minlength=len(uniques))
+    sxx = np.bincount(inverse, weights=x_c*x_c, minlength=len(uniques))
+    syy = np.bincount(inverse, weights=y_c*y_c, minlength=len(uniques))
+
+    def smooth(grid, n, sx, sy, sxx, syy):
+        std_x = np.sqrt(max(sxx/n - (sx/n)**2, 0))
+        std_y = np.sqrt(max(syy/n - (sy/n)**2, 0))
+        factor = n ** (-1/6)
+        kernel = _gaussian_kernel(std_x * factor / step, std_y * factor / step)
+        dens = fftconvolve(grid, kernel, mode="same")
+        # Le bruit d'arrondi de la FFT (~1e-16) ne doit pas créer de contours
+        dens[dens < 1e-10 * dens.max()] = 0
+        return dens / (n * step * step)
+
+    total = smooth(counts.sum(axis=0), n.sum(), sx.sum(), sy.sum(), sxx.sum(), syy.sum())
+    per_cat = {code: smooth(counts[j], n[j], sx[j], sy[j], sxx[j], syy[j])
+               for j, code in enumerate(uniques)}
+    return centers, total, per_cat
+
+def iso_levels(density,thresh,n_levels=10):
+    # Niveaux de contour en proportions de masse (comme sns.kdeplot) :
+    # le contour du niveau q entoure 1 - q de la densité
+    values = np.sort(density.ravel())[::-1]
+    cum = np.cumsum(values) / values.sum()
+    idx = np.searchsorted(cum, 1 - np.linspace(thresh, 1, n_levels))
+    return np.unique(np.take(values, idx, mode="clip"))
+
 def biplot(pca=[],x=None,y=None,components=[0,1],score=None,\
            coeff=None,coeff_labels=None,score_labels=None,circle='T',\
-           bigdata=1000,cat=None,cmap="viridis",density=True,xLabel=None,yLabel=None):
+           bigdata=1000,cat=None,cmap="viridis",density=True,xLabel=None,yLabel=None,show=True,\
+           raster=False):
     if isinstance(pca,PCA)==True :
+        # Modèle déjà ajusté : projection seulement (ou scores fournis)
+        if not hasattr(pca,"components_") : pca.fit(x)
         coeff = np.transpose(pca.components_[components, :])
-        score=  pca.fit_transform(x)[:,components]
+        if score is None : score = pca.transform(x)[:,components]
         if isinstance(x,pd.DataFrame)==True :
             coeff_labels = list(x.columns)
     if score is not None : x = score
@@ -33,7 +123,6 @@ def biplot(pca=[],x=None,y=None,components=[0,1],score=None,\
     x_c = temp / temp.max() * 2 - 1
     temp = (ys - ys.min())
     y_c = temp / temp.max() * 2 - 1
-    data = pd.DataFrame({"x_c":x_c,"y_c":y_c})
     print("Attention : pour des facilités d'affichage, les données sont centrées-réduites")
     if cat is None : cat = [0]*len(xs)
     elif len(pd.Series(cat)) == 1 : cat = list(pd.Series(cat))*len(xs)
@@ -42,8 +131,16 @@ def biplot(pca=[],x=None,y=None,components=[0,1],score=None,\
     fig = plt.figure(figsize=(6,6),facecolor='w') 
     ax = fig.add_subplot(111)
     # Affichage des points
+    # raster=True : points comptés par pixel et dessinés en une image
+    n_cat = len(cat.cat.categories)
     if (len(xs) < bigdata) :   
-        ax.scatter(x_c,y_c, c = cat.cat.codes,cmap=cmap)
+        if raster :
+            codes = cat.cat.codes.to_numpy()
+            norm = mpl.colors.Normalize(vmin=codes.min(), vmax=codes.max())
+            draw_raster(ax, x_c, y_c, codes, mpl.colormaps[cmap](norm(np.arange(n_cat))),
+                        extent=(-1.2,1.2,-1.2,1.2))
+        else :
+            ax.scatter(x_c,y_c, c = cat.cat.codes,cmap=cmap)
         if density==True : print("Warning ! Le mode density actif n'apparait que si BigData est paramétré.")
     # Affichage des nappes convexes (BigData)
     else :
@@ -51,33 +148,35 @@ def biplot(pca=[],x=None,y=None,components=[0,1],score=None,\
         norm = mpl.colors.Normalize(vmin=0, vmax=(len(np.unique(cat.cat.codes)))) #-(len(np.unique(c)))
         cmap = cmap
         m = cm.ScalarMappable(norm=norm, cmap=cmap)
+        if raster :
+            draw_raster(ax, x_c, y_c, cat.cat.codes.to_numpy(), [m.to_rgba(i) for i in range(n_cat)],
+                        extent=(-1.2,1.2,-1.2,1.2))
         if density==True :
             sns.set_style("white")
-            sns.kdeplot(x="x_c",y="y_c",data=data)
-            if len(np.unique(cat)) <= 1 :
-                sns.kdeplot(x="x_c",y="y_c",data=data, cmap="Blues", shade=True, thresh= 0)
+            # Densités calculées une fois sur une grille commune (KDE binnée)
+            centers, total, per_cat = grid_kde(x_c, y_c, cat.cat.codes.to_numpy())
+            ax.contour(centers, centers, total, levels=iso_levels(total, 0.05),
+                       cmap=sns.light_palette("C0", as_cmap=True))
+            # Une densité concentrée dans une seule case (un point, points
+            # confondus) n'a qu'un niveau : pas de nappe pour elle
+            if len(per_cat) <= 1 :
+                levels = iso_levels(total, 0)
+                if len(levels) >= 2 :
+                    ax.contourf(centers, centers, total, levels=levels, cmap="Blues")
             else :
-                for i in np.unique(cat) :
+                for i, dens in per_cat.items() :
+                    levels = iso_levels(dens, 0.25)
+                    if len(levels) < 2 : continue
                     color_temp = m.to_rgba(i)
-                    sns.kdeplot(x="x_c",y="y_c",data=data[cat==i], color=color_temp,
-                                shade=True, thresh=0.25, alpha=0.25)     
-        for cat_temp in cat.cat.codes.unique() :
-            x_c_temp = [x_c[i] for i in range(len(x_c)) if (cat.cat.codes[i] == cat_temp)]
-            y_c_temp = [y_c[i] for i in range(len(y_c)) if (cat.cat.codes[i] == cat_temp)]
-            points = [ [ None ] * len(x_c_temp) ] * 2
-            points = np.array(points)
-            points = points.reshape(len(x_c_temp),2)
-            points[:,0] = x_c_temp
-            points[:,1] = y_c_temp
-            hull = ConvexHull(points)
-            temp = 0
-            for simplex in hull.simplices:
-                color_temp = m.to_rgba(cat_temp)
-                plt.plot(points[simplex, 0], points[simplex, 1],color=color_temp)
-                if (temp == 0) :
-                     plt.xlim(-1,1)
-                     plt.ylim(-1,1)
-                     temp = temp+1
+                    ax.contourf(centers, centers, dens, levels=levels,
+                                cmap=sns.light_palette(color_temp, as_cmap=True), alpha=0.25)
+        # Une enveloppe par catégorie, dessinées en une seule collection
+        segments, colors = [], []
+        for cat_temp, segs in category_hulls(x_c, y_c, cat.cat.codes.to_numpy()) :
+            segments.append(segs)
+            colors += [m.to_rgba(cat_temp)] * len(segs)
+        if segments :
+            ax.add_collection(LineCollection(np.concatenate(segments), colors=colors))
     if coeff is not None :
         if (circle == 'T'):
             x_circle = np.linspace(-1, 1, 100)
@@ -104,4 +203,4 @@ def biplot(pca=[],x=None,y=None,components=[0,1],score=None,\
     plt.xlabel(xLabel if xLabel is not None else "PC{}".format(1))
     plt.ylabel(yLabel if yLabel is not None else "PC{}".format(2))
     plt.grid(linestyle='--')
-    plt.show()
\ No newline at end of file
+    if show : plt.show()
@@ -0,0 +1,132 @@
+import hashlib
+import inspect
+import json
+import os
+
+import pandas as pd
+
+from profiling import stage
+
+# =============================================================
+# Étapes du nettoyage et points de reprise
+# =============================================================
+# data_clean est une suite d'étapes nommées (cleaner.clean_steps). Avec un
+# dossier de points de reprise, la sortie de chaque étape y est écrite en
+# Parquet sous une clé :
+#   clé(étape) = sha256(clé de l'étape précédente, nom, configuration,
+#                       code de l'étape, modules partagés)
+# et la clé de départ est l'empreinte du DataFrame d'entrée. Les clés se
+# calculent donc avant de lancer quoi que ce soit : on recharge la sortie
+# de la dernière étape dont la clé est connue et on ne rejoue que les
+# suivantes. Modifier les règles "genre" de rules.json ne change que la
+# configuration de l'étape "music style" : les étapes précédentes sont
+# relues, celle-ci et les suivantes sont rejouées.
+#
+# Fichiers : cleaned_data.csv -> cleaned_data.stages/<étape>-<clé>.parquet
+# (un seul fichier par étape : l'ancien est supprimé). Sans pyarrow, ou si
+# une sortie ne peut pas être écrite en Parquet, l'étape est simplement
+# recalculée la fois suivante.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Code partagé par plusieurs étapes : le modifier invalide tout (aussi
+# l'état du mode incrémental, voir cleaner.CLEANING_FILES)
+SHARED_FILES = ["normalize.py", "rules.py", "fuzzy.py", "schema.py", "ingest.py", "checkpoints.py"]
+
+
+def checkpoint_dir(csv_path):
+    return os.path.splitext(csv_path)[0] + ".stages"
+
+
+def frame_digest(data):
+    """Empreinte sha256 du contenu d'un DataFrame (valeurs, colonnes, types, index)."""
+    h = hashlib.sha256(json.dumps([list(map(str, data.columns)), list(map(str, data.dtypes))]).encode())
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def shared_fingerprint(names=SHARED_FILES):
+    h = hashlib.sha256()
+    for name in names:
+        with open(os.path.join(HERE, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _step_source(fn):
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        return fn.__qualname__
+
+
+def step_keys(input_key, steps):
+    """Clé de chaque étape (voir en tête du module)."""
+    shared = shared_fingerprint()
+    keys = []
+    for name, fn, _, config in steps:
+        h = hashlib.sha256(input_key.encode())
+        h.update(json.dumps([name, config, _step_source(fn), shared], sort_keys=True, default=str).encode())
+        input_key = h.hexdigest()
+        keys.append(input_key)
+    return keys
+
+
+def _path(directory, name, key):
+    return os.path.join(directory, f"{name.replace(' ', '_')}-{key[:32]}.parquet")
+
+
+def load_checkpoint(directory, name, key):
+    path = _path(directory, name, key)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def save_checkpoint(directory, name, key, data):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return
+    path = _path(directory, name, key)
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        data.to_parquet(tmp)
+    except (pa.ArrowException, ValueError, TypeError) as e:
+        # Colonne non convertible (types mélangés...) : pas de point de reprise
+        print(f"Pas de point de reprise pour l'étape {name} : {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+    os.replace(tmp, path)
+    # Un seul point de reprise par étape
+    prefix = f"{name.replace(' ', '_')}-"
+    for other in os.listdir(directory):
+        if other.startswith(prefix) and other.endswith(".parquet") and os.path.join(directory, other) != path:
+            os.remove(os.path.join(directory, other))
+
+
+def run_steps(data, steps, directory=None):
+    """Applique les étapes [(nom, fonction, colonne, configuration)] à data.
+
+    Avec `directory`, repart du dernier point de reprise valable et
+    enregistre la sortie des étapes rejouées.
+    """
+    start = 0
+    if directory is not None:
+        with stage("checkpoint digest", data):
+            keys = step_keys(frame_digest(data), steps)
+        for i in range(len(steps) - 1, -1, -1):
+            with stage("checkpoint load"):
+                loaded = load_checkpoint(directory, steps[i][0], keys[i])
+            if loaded is not None:
+                data, start = loaded, i + 1
+                break
+    for i in range(start, len(steps)):
+        name, fn, column, _ = steps[i]
+        with stage(name, data, column):
+            data = fn(data)
+        if directory is not None:
+            with stage("checkpoint save"):
+                save_checkpoint(directory, name, keys[i], data)
+    return data
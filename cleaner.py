@@ -1,10 +1,21 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
-import re
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
+import os
+import sys
+import json
+import math
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from normalize import (ABSURD_GENRES, RULE_SPECS, clean_text_column, map_values, normalize_multi_valued,
+                       normalize_platform, normalize_language, normalize_musical_period, normalize_genre_or_drop)
+from checkpoints import SHARED_FILES, run_steps, shared_fingerprint
+from multihot import (MULTI_VALUED_COLUMNS, close_multihot, export_multihot, multihot_path, open_multihot_writer,
+                      write_multihot)
+from ingest import (RAW_NAMES, TIMESTAMP_HEADER, csv_source, iter_survey, match_headers, read_header, read_survey,
+                    survey_dtypes, to_canonical)
+from profiling import stage
+from schema import (COMPACT_TYPES, ENUM_CATEGORIES, export_typed, has_typed_export, open_typed_writer, to_compact,
+                    typed_path, write_typed)
 
 # --------- Code de base ---------
 # data = pd.read_csv('raw_data.csv')
@@ -15,434 +26,467 @@ from sklearn.preprocessing import StandardScaler
 # ---------------------------------
 
 # --------- Code améliorer avec Mistral AI ---------
-data = pd.read_csv('raw_data.csv', usecols=range(3, 23))
+# data = pd.read_csv('raw_data.csv', usecols=range(3, 23))
 # -----------------------------------------------------
+# Lecture par nom de question et non plus par position : voir ingest.py
+
+
+def read_raw(raw_path='raw_data.csv'):
+    with stage("read"):
+        return read_survey(raw_path)
+
+
+# -------------------------------------------------------------
+# Traductions en anglais (colonne: (mapping, valeur par défaut))
+# -------------------------------------------------------------
+# Les valeurs hors des réponses autorisées prennent la valeur par défaut
+# (ex. le genre : tout ce qui n'est pas femme/homme/non binaire).
+TRANSLATIONS = {
+    "instrumental or vocal music": ({
+        "instrumentaux": "instrumental music",
+        "avec des paroles": "vocal music",
+        "les deux": "both"
+    }, None),
+    # Type de parole
+    "type of singing": ({
+        "peu importe": "doesn't matter",
+        "engagées": "engaged",
+        "poétiques": "poetic",
+        "humoristiques": "humorous",
+        "peut importe": "doesn't matter"
+    }, "prefer not to answer"),
+    # Genre
+    "gender": ({
+        "femme": "woman",
+        "homme": "man",
+        "non binaire": "non-binary"
+    }, "prefer not to answer"),
+    "environment": ({
+        "banlieue": "suburb",
+        "ville": "city",
+        "campagne": "countryside"
+    }, "prefer not to answer"),
+    # Situation professionnelle
+    "professional situation": ({
+        "sans emploi": "unemployed",
+        "étudiant": "student",
+        "salarié": "employee",
+        "indépendant": "self-employed",
+        "retraité": "retired",
+        "Autre / Je ne souhaite pas répondre": "prefer not to answer"
+    }, "prefer not to answer"),
+}
+
+# Mapping numérique
+TEMPO_MAP = {1: 60, 2: 90, 3: 120, 4: 150, 5: 180}
+FREQ_MENSUELLE = {
+    "plus d'une fois par jour": 4,
+    "plus d'une fois par semaine": 3,
+    "plus d'une fois par mois": 2,
+    "moins d'une fois par mois": 1,
+}
+FREQ_JOUR = {
+    "plus de trois heures par jour": 3,
+    "plus d'une heure par jour": 2,
+    "moins d'une heure par jour": 1,
+}
+
+# Colonnes à choix multiples : (étape, colonne, jeu de règles de rules.json)
+MULTI_VALUED_STAGES = [
+    ("platform", "platform listening", "platform"),
+    ("language", "language listening", "language"),
+    ("musical period", "musical period", "musical_period"),
+    ("music style", "music style", "genre"),
+]
+NORMALIZERS = {
+    "platform": normalize_platform,
+    "language": normalize_language,
+    "musical_period": normalize_musical_period,
+    # Suppression des genres absurdes + normalisation des genres
+    "genre": normalize_genre_or_drop,
+}
+
+
+# -------------------------------------------------------------
+# Étapes du nettoyage
+# -------------------------------------------------------------
+# Chaque étape prend et renvoie le DataFrame. Sa configuration (ce dont
+# dépend son résultat, en plus du code) sert de clé aux points de reprise
+# (voir checkpoints.py).
+
+def step_rename(data):
+    # Renommage des colonnes en anglais, par question (ingest.RAW_SCHEMA) :
+    # sans effet si les données viennent de read_raw
+    return to_canonical(data)
+
+
+def step_text(data):
+    # Un seul passage par colonne texte : séparateurs "mot / mot" -> "mot;mot",
+    # parenthèses, strip/lower (voir clean_text_column)
+    for col in data.select_dtypes(include=['object']).columns:
+        if col not in TRANSLATIONS:
+            data[col] = clean_text_column(data[col])
+    return data
 
-def data_clean(data):
-    # -------------------------------------------------------------
-    # Renommage des colonnes en anglais et simplification des noms
-    # -------------------------------------------------------------
-    new_cols = ["instrumental or vocal music", "platform listening", "radio station", "music style", "musical period", "language listening", "type of singing", "frequency listening of emerging artist", "tempo", "frequency during working", "frequency during exercising", "frequency during cooking", "frequency during driving", "frequency for passing the time", "monthly listening frequency", "daily listening frequency", "gender", "age", "environment", "professional situation"]
-    data.columns = new_cols
-
-    # -------------------------------------------------------------
-    # Nettoyage global des colonnes
-    # -------------------------------------------------------------
-    text_cols = data.select_dtypes(include=['object']).columns
-
-    for col in text_cols:
-        # ---------------------------------------------------------
-        # Remplace "mot / mot" par "mot;mot" dans toutes les colonnes texte
-        # ---------------------------------------------------------
-        
-        # --------- Code de base ---------
-        # data[col] = data[col].str.replace(r'\s*/\s*', ';', regex=True)
-        # data[col] = data[col].str.replace(r'\s*,\s*', ';', regex=True)
-        # data[col] = data[col].str.replace(r'\s* ; \s*', ';', regex=True)
-        # data[col] = data[col].str.replace(r'\s* \( \s*', '(', regex=True)
-        # data[col] = data[col].str.replace(r'\s* \) \s*', ')', regex=True)
-        # data[col] = data[col].str.strip()
-        # data[col] = data[col].str.lower()
-        # -----------------------------------------
-        
-        # --------- Code améliorer avec Mistral AI ---------
-        data[col] = data[col].str.replace(r'\s*[\/,;]\s*', ';', regex=True)
-        data[col] = data[col].str.replace(r'\s*\(\s*', '(', regex=True) \
-                        .str.replace(r'\s*\)\s*', ')', regex=True)
-                        
-        text_cols = data.select_dtypes(include='object').columns
-        data[text_cols] = data[text_cols].apply(lambda col: col.str.strip().str.lower())
-        # -----------------------------------------------------
-        
-        # ---------------------------------------------------------
-        # Vérification des valeurs dans la colonne "genre"
-        # ---------------------------------------------------------
-        if col == "gender":
-            for entry in data[col]:
-                if (entry != "femme") and (entry != "homme") and (entry.lower() != "non binaire") and (entry!= "Je préfère ne pas répondre"):
-                    new_entry = "Je préfère ne pas répondre"
-                    data[col] = data[col].replace(entry, new_entry)
-
-            data[col].str.lower()
-        
-        # ---------------------------------------------------------
-        # Traductions des réponses en anglais
-        # ---------------------------------------------------------
-
-        series = data[col].astype(str).str.strip().str.lower()
-                
-        if col == "instrumental or vocal music":
-            mapping = {
-                "instrumentaux": "instrumental music",
-                "avec des paroles": "vocal music",
-                "les deux": "both"
-            }
-            data[col] = series.replace(mapping)
-
-        # Type de parole
-        if col == "type of singing":
-            mapping = {
-                "peu importe": "doesn't matter",
-                "engagées": "engaged",
-                "poétiques": "poetic",
-                "humoristiques": "humorous",
-                "humoristiques": "humorous",
-                "peut importe": "doesn't matter"
-            }
-            data[col] = series.map(lambda x: mapping.get(x, "prefer not to answer"))
-
-        # Genre
-        if col == "gender":
-            mapping = {
-                "femme": "woman",
-                "homme": "man",
-                "non binaire": "non-binary"
-            }
-            data[col] = series.map(lambda x: mapping.get(x, "prefer not to answer"))
-
-        if col == "environment":
-            mapping = {
-                "banlieue": "suburb",
-                "ville": "city",
-                "campagne": "countryside"
-            }
-            data[col] = series.map(lambda x: mapping.get(x, "prefer not to answer"))
-
-        # Situation professionnelle
-        if col == "professional situation":
-            mapping = {
-                "sans emploi": "unemployed",
-                "étudiant": "student",
-                "salarié": "employee",
-                "indépendant": "self-employed",
-                "retraité": "retired",
-                "Autre / Je ne souhaite pas répondre": "prefer not to answer"
-            }
-            data[col] = series.map(lambda x: mapping.get(x, "prefer not to answer"))
-
-    # -------------------------------------------------------------
-    # Normalisation des plateformes d'écoute
-    # -------------------------------------------------------------
-    def normalize_platform(g):
-        if not isinstance(g, str):
-            return None
-        g = g.lower().strip()
-
-        # Pop regroupée
-        if g in ["plateforme de streaming", "avec alexa de chez amazon", "spotify", "deezer", "youtube", "youtube music", "apple music", "amazon music", "tidal", "soundcloud", "napster", "youtube et tv", "pc youtube", "et téléchargement", "youtube et réseaux sociaux", "téléchargement des musiques", "you tube"]:
-            return "streaming platform"
-        
-        if g in ["morceaux locaux"]:
-            return "local music"
-        
-        if g in ["radio"]:
-            return "radio"
-        
-        if g in ["cd", "dvd", "vinyle", "vinyles", "cd;dvd", "dvd;cd", "cd;dvd;vinyle", "clé usb", "support usb", "chaînes de clips", "bibliothèque de musique", "mp3", "mon lecteur cd gulli", "cassette dans ma magnifique voiture", "mobile"]:
-            return "cd;dvd;vinyl"
-
-        if g in ["concert", "concerts", "atelier de musique", "live", "festival"]:
-            return "concert"
 
-        else:
-            return g
-    def apply_platform_normalization(value):
-        if not isinstance(value, str):
-            return np.nan
-
-        genres = [g.strip() for g in value.split(";")]
-
-        normalized = []
-        for g in genres:
-            ng = normalize_platform(g)
-            if ng:
-                normalized.append(ng)
-
-        # Enlever doublons
-        normalized = list(dict.fromkeys(normalized))
-        return ";".join(normalized) if normalized else np.nan
-
-    data["platform listening"] = data["platform listening"].apply(apply_platform_normalization)
-    
-    # -------------------------------------------------------------
-    # Normalisation des langues d'écoutes
-    # -------------------------------------------------------------
-    def normalize_language(g):
-        if not isinstance(g, str):
-            return None
-        g = g.lower().strip()
-
-        # Pop regroupée
-        if g in ["francophone"]:
-            return "french"
-        
-        if g in ["anglophone"]:
-            return "english"
-        
-        if g in ["asiatique"]:
-            return "asian"
-        if g in ["japonais", "japonaise"]:
-            return "japanese"
-        
-        if g in ["coréen", "coréenne"]:
-            return "korean"
-        
-        if g in ["hispanique"]:
-            return "spanish"
-
-        if g in ["brésilienne"]:
-            return "brazilian"
-        
-        if g in ["allemande"]:
-            return "german"
-        
-        if g in ["cyrillique", "russe"]:
-            return "cyrillic"
-        
-        if g in ["italienne", "italien"]:
-            return "italian"
-        
-        if g in ["scandinave"]:
-            return "scandinavian"
-        
-        if g in ["bulgare"]:
-            return "bulgarian"
-        
-        if g in ["bretonne"]:
-            return "breton"
-
-        if g in ["il y a pas trop de paroles", "tout"]:
-            return ""
+def step_translate(data):
+    # Même nettoyage, puis validation/traduction sur les catégories
+    for col in data.select_dtypes(include=['object']).columns:
+        if col in TRANSLATIONS:
+            mapping, default = TRANSLATIONS[col]
+            data[col] = clean_text_column(data[col], mapping, default, ENUM_CATEGORIES.get(col))
+    return data
 
-        else:
-            return  g
-    def apply_language_normalization(value):
-        if not isinstance(value, str):
-            return np.nan
-
-        genres = [g.strip() for g in value.split(";")]
-
-        normalized = []
-        for g in genres:
-            ng = normalize_language(g)
-            if ng:
-                normalized.append(ng)
-
-        # Enlever doublons
-        normalized = list(dict.fromkeys(normalized))
-        return ";".join(normalized) if normalized else np.nan
-
-    data["language listening"] = data["language listening"].apply(apply_language_normalization)
-
-    # -------------------------------------------------------------
-    # Normalisation de la période musicale
-    # -------------------------------------------------------------
-    def normalize_musical_period(g):
-        if not isinstance(g, str):
-            return None
-        g = g.lower().strip()
-
-        # Pop regroupée
-        if g in ["années 50 - 70"]:
-            return "1950s-1970s"
-        
-        if g in ["années 70 - 90"]:
-            return "1970s-1990s"
-        
-        if g in ["années 90"]:
-            return "1990s"
-        
-        if g in ["années 2000"]:
-            return "2000s"
-        
-        if g in ["années 2010"]:
-            return "2010s"
-        
-        if g in ["années 2020"]:
-            return "2020s"
-        
-        if g in ["je ne sais pas"]:
-            return "i don't know"
-        
-        if g in ["pas de préférence"]:
-            return "no preference"
-
-    def apply_musical_period_normalization(value):
-        if not isinstance(value, str):
-            return np.nan
-
-        genres = [g.strip() for g in value.split(";")]
-
-        normalized = []
-        for g in genres:
-            ng = normalize_musical_period(g)
-            if ng:
-                normalized.append(ng)
-
-        # Enlever doublons
-        normalized = list(dict.fromkeys(normalized))
-        return ";".join(normalized) if normalized else np.nan
-
-    data["musical period"] = data["musical period"].apply(apply_musical_period_normalization)
-
-    # ======================================================
-    # Suppresion des genres absurdes
-    # ======================================================
-    motifs_a_supprimer = [
-        "je ne peux pas me satisfaire",
-        "je n'écoute que rarement",
-        "rap anglais des années 90",
-        "musique de dépression",
-        "sokuuu",
-        "années",
-        "60", "70", "80", "90", "2000", 
-        "etc)",
-        "2015",
-        "avec des textes"
+
+def step_multi_valued(column, ruleset):
+    # Normalisation d'une colonne à choix multiples : voir normalize.py. Le
+    # filtre des genres absurdes (un seul automate) et les règles ne sont
+    # évalués qu'une fois par token distinct.
+    def run(data):
+        data[column] = normalize_multi_valued(data[column], NORMALIZERS[ruleset])
+        return data
+    return run
+
+
+def step_numeric(data):
+    data["tempo"] = data["tempo"].replace(TEMPO_MAP)
+    data["monthly listening frequency"] = map_values(data["monthly listening frequency"], FREQ_MENSUELLE)
+    data["daily listening frequency"] = map_values(data["daily listening frequency"], FREQ_JOUR)
+    # Types compacts (voir schema.py) : les colonnes texte sont déjà
+    # catégorielles, restent les échelles et le tempo
+    return to_compact(data)
+
+
+def clean_steps(impute_age=False, age_mean=None):
+    """Étapes de data_clean, dans l'ordre : [(nom, fonction, colonne, configuration)]."""
+    steps = [
+        ("rename", step_rename, None, {"columns": RAW_NAMES}),
+        ("text", step_text, None, {}),
+        ("translate", step_translate, None, {"translations": TRANSLATIONS, "categories": ENUM_CATEGORIES}),
     ]
+    for name, column, ruleset in MULTI_VALUED_STAGES:
+        config = {"rules": RULE_SPECS[ruleset]}
+        if ruleset == "genre":
+            config["absurd"] = ABSURD_GENRES
+        steps.append((name, step_multi_valued(column, ruleset), column, config))
+    steps.append(("numeric", step_numeric, None,
+                  {"tempo": TEMPO_MAP, "monthly": FREQ_MENSUELLE, "daily": FREQ_JOUR, "types": COMPACT_TYPES}))
+    if impute_age:
+        steps.append(("impute age", lambda data: impute_age_mean(data, age_mean), None, {"age_mean": age_mean}))
+    return steps
+
+
+def data_clean(data, output='cleaned_data.csv', impute_age=False, age_mean=None, checkpoint_dir=None):
+    """Nettoie l'export brut (étapes de clean_steps) et l'écrit dans output.
+
+    Avec checkpoint_dir, la sortie de chaque étape y est gardée (Parquet)
+    sous l'empreinte de son entrée et de sa configuration : au lancement
+    suivant, on repart de la dernière étape inchangée.
+    """
+    data = run_steps(data, clean_steps(impute_age, age_mean), checkpoint_dir)
+    if output is not None:
+        export_cleaned(data, output)
 
-    escaped = [re.escape(m) for m in motifs_a_supprimer]
-    pattern = "(" + "|".join(escaped) + ")"
-
-    def clean_absurd_genres(value):
-        if not isinstance(value, str):
-            return np.nan
-        genres = [g.strip() for g in value.split(";")]
-        cleaned = []
-        for g in genres:
-            if re.search(pattern, g, flags=re.IGNORECASE):
-                continue
-            cleaned.append(g)
-        if len(cleaned) == 0:
-            return np.nan
-        return ";".join(cleaned)
-
-    data["music style"] = data["music style"].apply(clean_absurd_genres)
-    data["music style"] = data["music style"].replace(r'^\s*$', np.nan, regex=True)
-
-
-    # ======================================================
-    # Normalisation des genres musicaux
-    # ======================================================
-    def normalize_genre(g):
-        if not isinstance(g, str):
-            return None
-        g = g.lower().strip()
-
-        # Pop regroupée
-        if g in ["k-pop", "j-pop", "dream pop"]:
-            return "pop"
-
-        # Variété française
-        if g in ["variété française", "variete française", "chanson française à texte", "chanson francaise"]:
-            return "french variety"
-
-        # Métal / Metal
-        if "metal" in g or "métal" in g:
-            return "metal"
-
-        # Rock & dérivés
-        if g in [
-            "hard rock", "rock prog", "indie rock", "alt rock",
-            "rock progressif", "rock'n'roll", "rock n roll", "rock and roll",
-            "alternative", "gothique", "indie", "musique alternative"
-        ] or g.startswith("rock"):
-            return "rock"
-
-        # Electro variations
-        if g in [
-            "electro chill et populaires", "electro populaire", "electrique",
-            "drum and bass", "breakcore", "dubstep", "chiptune", "dance",
-            "vocaloid", "house"
-        ]:
-            return "electro"
-        
-        # techno
-        if g in [
-            "techno", "tekno", "teknò", "tecno", "hardtechno", "hardtech",
-            "hardteck", "uptempo", "hardstyle", "hard style", "rawstyle",
-            "industrial techno", "des gros kicks sa mere", "hxc", "tech(uptempo"
-        ]:
-            return "techno"
-        
-        # rap
-        if g in ["r&b", "hip-hop"]:
-            return "rap"
-        
-        # jazz
-        if g in ["soul", "blues"]:
-            return "jazz"
-
-        # folk
-        if g in ["musique du monde", "reggae", "celtique", "shatta"]:
-            return "folk"
-        
-        # ost
-        if g in ["musique de jeux"]:
-            return "ost"
-        
-        # éclectique
-        if g in ["indépendant divers", "éclectique"]:
-            return "eclectic"
-
-        # Aucun → pas de préférences
-        if g in ["aucun préféré", "aucun", "aucun preference", "aucune idée", "pas de préférences"]:
-            return "no preferences"
-
-        # Musique classique
-        if g == "musique classique":
-            return "classical music"
-
-        return g
-
-    def apply_genre_normalization(value):
-        if not isinstance(value, str):
-            return np.nan
-
-        genres = [g.strip() for g in value.split(";")]
-
-        normalized = []
-        for g in genres:
-            ng = normalize_genre(g)
-            if ng:
-                normalized.append(ng)
-
-        # Enlever doublons
-        normalized = list(dict.fromkeys(normalized))
-        return ";".join(normalized) if normalized else np.nan
-
-    data["music style"] = data["music style"].apply(apply_genre_normalization)
-
-
-    # -------------------------------------------------------------
-    # Mapping numérique
-    # -------------------------------------------------------------
-    tempo_map = {1: 60, 2: 90, 3: 120, 4: 150, 5: 180}
-    data["tempo"] = data["tempo"].replace(tempo_map)
-
-    freq_mensuelle = {
-        "plus d'une fois par jour": 4,
-        "plus d'une fois par semaine": 3,
-        "plus d'une fois par mois": 2,
-        "moins d'une fois par mois": 1,
-    }
-    data["monthly listening frequency"] = data["monthly listening frequency"].replace(freq_mensuelle)
+    return data
 
-    freq_jour = {
-        "plus de trois heures par jour": 3,
-        "plus d'une heure par jour": 2,
-        "moins d'une heure par jour": 1,
-    }
-    data["daily listening frequency"] = data["daily listening frequency"].replace(freq_jour)
 
-    # -------------------------------------------------------------
-    # Finalisation et export
-    # -------------------------------------------------------------
-    data.to_csv('cleaned_data.csv', index=False)
-    print("cleaned_data.csv created successfully ✅")
+# -------------------------------------------------------------
+# Imputation de l'âge par la moyenne (comme dans main2.py)
+# -------------------------------------------------------------
+def impute_age_mean(data, age_mean=None):
+    data["age"] = pd.to_numeric(data["age"], errors="coerce")
+    if age_mean is None:
+        age_mean = mean_from_stats(age_stats(data["age"]))
+    data["age"] = data["age"].fillna(age_mean)
+    return data
+
 
+# -------------------------------------------------------------
+# Finalisation et export
+# -------------------------------------------------------------
+def export_cleaned(data, output):
+    with stage("to_csv", data):
+        data.to_csv(output, index=False)
+    with stage("export multihot", data):
+        export_multihot(data, output)
+    with stage("export typed", data):
+        export_typed(data, output)
+    print(f"{output} created successfully ✅")
+
+
+# -------------------------------------------------------------
+# Mode parallèle : nettoyage par morceaux sur plusieurs processus
+# -------------------------------------------------------------
+def _clean_shard(shard):
+    # Étapes locales à chaque ligne uniquement (pas d'imputation ni d'export)
+    return data_clean(shard, output=None)
+
+
+def data_clean_parallel(data, workers=None, output='cleaned_data.csv', impute_age=False):
+    """Comme data_clean, en répartissant les lignes sur `workers` processus.
+
+    Les morceaux sont contigus et recollés dans l'ordre : le résultat est
+    identique au chemin séquentiel. Les étapes globales (moyenne de l'âge)
+    sont faites après la fusion.
+    """
+    workers = workers or os.cpu_count()
+    shards = [data.iloc[i:j] for i, j in shard_bounds(len(data), workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        data = pd.concat(list(pool.map(_clean_shard, shards)))
+    # Catégories différentes d'un morceau à l'autre : pd.concat repasse en object
+    data = to_compact(data)
+    if impute_age:
+        data = impute_age_mean(data)
+    if output is not None:
+        export_cleaned(data, output)
     return data
 
 
-# Lancement
-cleaned = data_clean(data)
+def shard_bounds(n_rows, n_shards):
+    edges = np.linspace(0, n_rows, min(n_shards, n_rows) + 1).astype(int) if n_rows else [0, 0]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+# -------------------------------------------------------------
+# Statistiques fusionnables pour la moyenne de l'âge
+# -------------------------------------------------------------
+def age_stats(ages):
+    # (somme, effectif) : deux morceaux se fusionnent en additionnant
+    ages = pd.to_numeric(ages, errors="coerce").dropna()
+    return math.fsum(ages), len(ages)
+
+
+def merge_stats(a, b):
+    return math.fsum([a[0], b[0]]), a[1] + b[1]
+
+
+def mean_from_stats(stats):
+    total, count = stats
+    return total / count if count else np.nan
+
+
+# -------------------------------------------------------------
+# Mode streaming : lecture par morceaux, mémoire bornée
+# -------------------------------------------------------------
+def clean_stream(raw_path='raw_data.csv', output='cleaned_data.csv', chunksize=100_000, impute_age=False):
+    """Nettoie raw_path morceau par morceau et ajoute chaque morceau à output.
+
+    Premier passage (colonnes numériques seulement) : types des colonnes
+    et moyenne de l'âge sur tout le fichier, pour que le résultat soit
+    identique à data_clean sur le fichier chargé en entier. Second
+    passage : nettoyage et export.
+    """
+    dtypes = survey_dtypes(raw_path, chunksize)
+    age_mean = None
+    if impute_age:
+        stats = (0.0, 0)
+        for chunk in iter_survey(raw_path, chunksize, ["age"], dtypes):
+            stats = merge_stats(stats, age_stats(chunk["age"]))
+        age_mean = mean_from_stats(stats)
+
+    reader = iter_survey(raw_path, chunksize, dtypes=dtypes)
+    # Matrices multi-hot : chaque morceau est écrit sur disque dès qu'il
+    # est encodé (vocabulaire partagé)
+    writers = {col: open_multihot_writer(multihot_path(output, col)) for col in MULTI_VALUED_COLUMNS}
+
+    typed_writer = open_typed_writer(output)
+    header = True
+    for chunk in reader:
+        cleaned = data_clean(chunk, output=None, impute_age=impute_age, age_mean=age_mean)
+        with stage("to_csv", cleaned):
+            cleaned.to_csv(output, index=False, mode='w' if header else 'a', header=header)
+        header = False
+        if typed_writer is not None:
+            with stage("export typed", cleaned):
+                write_typed(typed_writer, cleaned)
+        with stage("export multihot", cleaned):
+            for col in MULTI_VALUED_COLUMNS:
+                write_multihot(writers[col], cleaned[col])
+
+    for writer in writers.values():
+        close_multihot(writer)
+    if typed_writer is not None:
+        typed_writer.close()
+    print(f"{output} created successfully ✅")
+    return dtypes
+
+
+# -------------------------------------------------------------
+# Mode incrémental : ne nettoyer que les nouvelles réponses
+# -------------------------------------------------------------
+# Chaque réponse brute est identifiée par un hachage de son Horodateur et
+# de son contenu. L'état (empreinte des règles, hachage du fichier brut,
+# taille et date du CSV de sortie, types des colonnes, clés des réponses
+# déjà nettoyées) est conservé à côté de la sortie. Si les règles ou le
+# code de nettoyage changent, si des réponses déjà vues ont été modifiées
+# ou si la sortie a été réécrite depuis (autre mode de clean, main.py...),
+# on reconstruit tout. Quand le fichier brut n'a fait que grandir (début
+# identique octet pour octet), seules les nouvelles lignes sont lues : le
+# coût d'un ajout dépend du nombre de nouvelles réponses, pas de la
+# taille des données.
+# L'imputation de l'âge dépend de toutes les lignes : pas de mode
+# incrémental pour elle.
+KEY_COLUMNS = [TIMESTAMP_HEADER] + RAW_NAMES   # Horodateur + réponses
+# Fichiers dont dépend la sortie : code partagé des étapes, règles,
+# étapes elles-mêmes et écriture des matrices multi-hot
+CLEANING_FILES = SHARED_FILES + ["rules.json", "cleaner.py", "multihot.py"]
+
+
+def state_paths(output):
+    root = os.path.splitext(output)[0]
+    return root + ".state.json", root + ".state.npy"
+
+
+def rules_fingerprint():
+    return shared_fingerprint(CLEANING_FILES)
+
+
+def file_digest(path, size=None):
+    # sha256 du fichier, ou de ses `size` premiers octets
+    h = hashlib.sha256()
+    remaining = os.path.getsize(path) if size is None else size
+    with open(path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h.hexdigest()
+
+
+def appended_offset(raw_path, state):
+    """Taille du fichier brut déjà nettoyé si le fichier actuel commence
+    par exactement les mêmes octets (terminés par une fin de ligne), sinon 0."""
+    size = state.get("raw_size", 0)
+    if not size or os.path.getsize(raw_path) < size:
+        return 0
+    with open(raw_path, "rb") as f:
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            return 0
+    return size if file_digest(raw_path, size) == state["raw_digest"] else 0
+
+
+def raw_row_keys(raw_path, chunksize=100_000, offset=0):
+    # Hachage du texte brut : ne dépend pas des types lus. Colonnes prises
+    # par nom, dans l'ordre de KEY_COLUMNS (pas celui du fichier)
+    found = match_headers(read_header(raw_path), KEY_COLUMNS)
+    headers = [found[name] for name in KEY_COLUMNS]
+    source, options = csv_source(raw_path, offset)
+    try:
+        keys = [pd.util.hash_pandas_object(chunk[headers], index=False).to_numpy()
+                for chunk in pd.read_csv(source, usecols=headers, dtype=str,
+                                         keep_default_na=False, chunksize=chunksize, **options)]
+    finally:
+        if offset:
+            source.close()
+    return np.concatenate(keys) if keys else np.array([], dtype=np.uint64)
+
+
+def output_stamp(output):
+    # Taille et date de modification du CSV de sortie
+    stat = os.stat(output)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def save_state(output, raw_path, dtypes, keys, digest=None):
+    json_path, keys_path = state_paths(output)
+    state = {
+        "fingerprint": rules_fingerprint(),
+        "raw_digest": digest or file_digest(raw_path),
+        "raw_size": os.path.getsize(raw_path),
+        "output": output_stamp(output),
+        "dtypes": dtypes,
+        "rows": len(keys),
+    }
+    with open(json_path, "w") as f:
+        json.dump(state, f, indent=2)
+    np.save(keys_path, keys)
+
+
+def load_state(output):
+    json_path, keys_path = state_paths(output)
+    outputs = [output, json_path, keys_path] + [multihot_path(output, col) for col in MULTI_VALUED_COLUMNS]
+    if has_typed_export():
+        outputs.append(typed_path(output))
+    if not all(os.path.exists(p) for p in outputs):
+        return None
+    with open(json_path) as f:
+        state = json.load(f)
+    if state["fingerprint"] != rules_fingerprint():
+        print("Règles de nettoyage modifiées : reconstruction complète")
+        return None
+    if state.get("output") != output_stamp(output):
+        print(f"{output} réécrit depuis le dernier ajout : reconstruction complète")
+        return None
+    return state
+
+
+def clean_incremental(raw_path='raw_data.csv', output='cleaned_data.csv', chunksize=100_000):
+    """Ajoute à output uniquement les réponses de raw_path pas encore nettoyées."""
+    state = load_state(output)
+    digest = file_digest(raw_path)
+    if state is not None and state["raw_digest"] == digest:
+        print(f"{output} is already up to date ✅")
+        return
+
+    # Fichier brut complété à la fin : seules les nouvelles lignes sont
+    # lues (à partir de l'octet `offset`) ; sinon on relit tout et on
+    # compare les clés des réponses déjà nettoyées
+    keys, offset, start = None, 0, 0
+    if state is not None:
+        old_keys = np.load(state_paths(output)[1])
+        offset = appended_offset(raw_path, state)
+        if offset:
+            keys = np.concatenate([old_keys, raw_row_keys(raw_path, chunksize, offset)])
+        else:
+            keys = raw_row_keys(raw_path, chunksize)
+            start = len(old_keys)
+            if len(old_keys) > len(keys) or not (keys[:len(old_keys)] == old_keys).all():
+                print("Réponses déjà nettoyées modifiées ou supprimées : reconstruction complète")
+                state = None
+
+    # Les nouvelles lignes ne doivent pas changer les types lus (ex. du
+    # texte dans la colonne de l'âge la fait lire en texte partout)
+    if state is not None:
+        dtypes = state["dtypes"]
+        if survey_dtypes(raw_path, chunksize, dtypes, start, offset) != dtypes:
+            print("Types des colonnes modifiés : reconstruction complète")
+            state = None
+
+    if state is None:
+        keys = raw_row_keys(raw_path, chunksize) if keys is None else keys
+        dtypes = clean_stream(raw_path, output, chunksize)
+        save_state(output, raw_path, dtypes, keys, digest)
+        return
+
+    # Nouvelles lignes : ajoutées au CSV, et écrites dans une nouvelle
+    # partie de chaque matrice et du Parquet (rien n'est relu ni réécrit)
+    if len(keys) > len(old_keys):
+        writers = {col: open_multihot_writer(multihot_path(output, col), append=True)
+                   for col in MULTI_VALUED_COLUMNS}
+        typed_writer = open_typed_writer(output, append=True)
+        for chunk in iter_survey(raw_path, chunksize, dtypes=dtypes, start=start, offset=offset):
+            cleaned = data_clean(chunk, output=None)
+            with stage("to_csv", cleaned):
+                cleaned.to_csv(output, index=False, mode='a', header=False)
+            if typed_writer is not None:
+                with stage("export typed", cleaned):
+                    write_typed(typed_writer, cleaned)
+            with stage("export multihot", cleaned):
+                for col in MULTI_VALUED_COLUMNS:
+                    write_multihot(writers[col], cleaned[col])
+        for writer in writers.values():
+            close_multihot(writer)
+        if typed_writer is not None:
+            typed_writer.close()
+    save_state(output, raw_path, dtypes, keys, digest)
+    print(f"{len(keys) - len(old_keys)} new rows added to {output} ✅")
+
+
+# Lancement : python cleaner.py [--stream [N] | --incremental | --workers [N] | --checkpoints]
+# (équivalent à python cli.py clean, voir cli.py)
+if __name__ == "__main__":
+    from cli import main
+    main(["clean"] + sys.argv[1:])
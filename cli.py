@@ -0,0 +1,109 @@
+import argparse
+
+# =============================================================
+# Point d'entrée en ligne de commande
+# =============================================================
+#   python cli.py clean [--stream [N] | --incremental | --workers [N] | --checkpoints] [--impute-age]
+#                       [--profile [JSON]]
+# (--impute-age n'est pas disponible avec --incremental)
+#   python cli.py analyse [--report [DIR] [--workers N] [--format FMT] | --wide]
+#   python cli.py generate N [--output FICHIER] [--seed S]
+# Les modules (et pandas, matplotlib, sklearn...) ne sont importés que par
+# la commande qui en a besoin.
+
+
+def clean(args):
+    from cleaner import clean_incremental, clean_stream, data_clean, data_clean_parallel, read_raw
+    from checkpoints import checkpoint_dir
+
+    if args.profile is not None:
+        from profiling import print_report, start_profile, stop_profile, write_report
+        start_profile()
+    if args.stream:
+        clean_stream(args.raw, args.output, chunksize=args.stream, impute_age=args.impute_age)
+    elif args.incremental:
+        clean_incremental(args.raw, args.output)
+    elif args.workers is not None:
+        data_clean_parallel(read_raw(args.raw), workers=args.workers or None, output=args.output,
+                            impute_age=args.impute_age)
+    else:
+        data_clean(read_raw(args.raw), output=args.output, impute_age=args.impute_age,
+                   checkpoint_dir=checkpoint_dir(args.output) if args.checkpoints else None)
+    if args.profile is not None:
+        report = stop_profile()
+        print_report(report)
+        if args.profile:
+            write_report(report, args.profile)
+
+
+def analyse(args):
+    from analyse import analyse, compute_wide_analysis, render_report
+
+    if args.wide:
+        compute_wide_analysis(args.csv)
+    elif args.report:
+        render_report(args.csv, args.report, workers=args.workers, fmt=args.format or "png")
+    else:
+        analyse(args.csv)
+
+
+def generate(args):
+    from synthetic import write_survey
+
+    write_survey(args.output, args.rows, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nettoyage et analyse du questionnaire sur l'écoute musicale")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("clean", help="nettoie raw_data.csv")
+    p.add_argument("--raw", default="raw_data.csv", help="export brut du formulaire")
+    p.add_argument("--output", default="cleaned_data.csv", help="CSV nettoyé")
+    p.add_argument("--impute-age", action="store_true", help="remplace les âges manquants par la moyenne (pas avec --incremental)")
+    p.add_argument("--profile", nargs="?", const="", metavar="JSON",
+                   help="mesure chaque étape du nettoyage (temps, mémoire, effectifs) ; rapport JSON dans JSON")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--stream", type=int, nargs="?", const=100_000, metavar="N",
+                      help="lecture par morceaux de N lignes")
+    mode.add_argument("--incremental", action="store_true", help="ne nettoie que les nouvelles réponses")
+    mode.add_argument("--workers", type=int, nargs="?", const=0, metavar="N",
+                      help="nettoyage sur N processus (défaut : tous les coeurs)")
+    mode.add_argument("--checkpoints", action="store_true",
+                      help="garde la sortie de chaque étape : seules les étapes modifiées sont rejouées")
+    p.set_defaults(func=clean)
+    clean_parser = p
+
+    p = commands.add_parser("analyse", help="ACP et graphiques sur les données nettoyées")
+    p.add_argument("--csv", default="cleaned_data.csv", help="CSV nettoyé (le .parquet voisin est utilisé s'il existe)")
+    p.add_argument("--report", nargs="?", const="figures", metavar="DIR",
+                   help="écrit toutes les figures dans DIR sans les afficher")
+    p.add_argument("--workers", type=int, metavar="N", help="processus de rendu (mode --report)")
+    p.add_argument("--wide", action="store_true",
+                   help="ACP creuse avec les indicatrices genres/plateformes/langues/radios")
+    p.add_argument("--format", help="format des figures (png, svg, pdf...), défaut png (mode --report)")
+    p.set_defaults(func=analyse)
+    analyse_parser = p
+
+    p = commands.add_parser("generate", help="écrit un export brut synthétique (mêmes colonnes que raw_data.csv)")
+    p.add_argument("rows", type=int, help="nombre de réponses")
+    p.add_argument("--output", default="synthetic_raw.csv", help="CSV à écrire")
+    p.add_argument("--seed", type=int, default=0, help="graine du générateur")
+    p.set_defaults(func=generate)
+
+    args = parser.parse_args(argv)
+    if args.command == "clean" and args.incremental and args.impute_age:
+        # La moyenne dépend de toutes les lignes : pas d'imputation en mode incrémental
+        clean_parser.error("--impute-age ne peut pas être combiné avec --incremental")
+    if args.command == "analyse":
+        # --wide n'écrit pas de figures : ses options seraient ignorées
+        if args.wide and args.report:
+            analyse_parser.error("--wide ne peut pas être combiné avec --report")
+        for option, value in (("--workers", args.workers), ("--format", args.format)):
+            if value is not None and not args.report:
+                analyse_parser.error(f"{option} n'est disponible qu'avec --report")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
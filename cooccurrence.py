@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from multihot import current_multihot, multihot_path
+from pca_cache import matrix_digest
+
+# =============================================================
+# Comptages et co-occurrences des réponses multiples (genres...)
+# =============================================================
+# À partir de la matrice creuse répondants x genres X (multihot.py) :
+#   comptages       : sommes des colonnes de X
+#   co-occurrences  : XᵀX (diagonale = comptages)
+#   lift            : P(a et b) / (P(a) P(b))
+#   Jaccard         : |a et b| / |a ou b|
+# Les comptages et XᵀX sont rangés dans cleaned_data.music_style.cooc.npz
+# avec l'empreinte de X : recalculés seulement si les données changent.
+
+
+def cooc_path(csv_path, column):
+    return os.path.splitext(multihot_path(csv_path, column))[0] + ".cooc.npz"
+
+
+def cooccurrence_stats(matrix, vocabulary):
+    """Comptages et matrice de co-occurrence (CSR) d'une matrice multi-hot."""
+    x = sparse.csr_matrix(matrix, dtype=np.int64)
+    return {
+        "vocabulary": list(vocabulary),
+        "n_respondents": x.shape[0],
+        "counts": np.asarray(x.sum(axis=0)).ravel(),
+        "cooccurrence": (x.T @ x).tocsr(),
+    }
+
+
+def _save_stats(path, stats, digest):
+    co = stats["cooccurrence"]
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, digest=digest, vocabulary=np.array(stats["vocabulary"], dtype=str),
+             n_respondents=stats["n_respondents"], counts=stats["counts"],
+             data=co.data, indices=co.indices, indptr=co.indptr, shape=np.array(co.shape))
+    os.replace(tmp, path)
+
+
+def _load_stats(path, digest):
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        if str(f["digest"]) != digest:
+            return None
+        return {
+            "vocabulary": list(f["vocabulary"]),
+            "n_respondents": int(f["n_respondents"]),
+            "counts": f["counts"],
+            "cooccurrence": sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"])),
+        }
+
+
+def genre_stats(csv_path="cleaned_data.csv", column="music style", series=None):
+    """Comptages et co-occurrences de `column`, depuis le cache si possible.
+
+    La matrice vient du .npz écrit par le nettoyage s'il est à jour ; à
+    défaut, elle est encodée à partir de `series` (la colonne "a;b;c" déjà
+    chargée) ou du CSV (voir multihot.current_multihot).
+    """
+    matrix, vocabulary = current_multihot(csv_path, column, series=series)
+
+    digest = matrix_digest(matrix, {"vocabulary": list(vocabulary)})
+    stats = _load_stats(cooc_path(csv_path, column), digest)
+    if stats is None:
+        stats = cooccurrence_stats(matrix, vocabulary)
+        _save_stats(cooc_path(csv_path, column), stats, digest)
+    return stats
+
+
+def counts_frame(stats):
+    # Même présentation que value_counts() : du plus cité au moins cité
+    frame = pd.DataFrame({"genre": stats["vocabulary"], "count": stats["counts"]})
+    frame = frame[frame["count"] > 0]
+    return frame.sort_values("count", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def lift(stats):
+    """Lift de chaque paire (CSR, seulement les paires observées)."""
+    co = stats["cooccurrence"].tocoo()
+    counts = stats["counts"].astype(float)
+    values = co.data * stats["n_respondents"] / (counts[co.row] * counts[co.col])
+    return sparse.csr_matrix((values, (co.row, co.col)), shape=co.shape)
+
+
+def jaccard(stats):
+    """Indice de Jaccard de chaque paire (CSR, seulement les paires observées)."""
+    co = stats["cooccurrence"].tocoo()
+    counts = stats["counts"].astype(float)
+    values = co.data / (counts[co.row] + counts[co.col] - co.data)
+    return sparse.csr_matrix((values, (co.row, co.col)), shape=co.shape)
+
+
+def pair_frame(stats, top=None):
+    """Tableau des paires de réponses différentes (a < b) : co-occurrences,
+    lift et Jaccard, trié par nombre de co-occurrences."""
+    co = sparse.triu(stats["cooccurrence"], k=1).tocoo()
+    counts = stats["counts"].astype(float)
+    vocabulary = np.array(stats["vocabulary"], dtype=object)
+    frame = pd.DataFrame({
+        "genre a": vocabulary[co.row],
+        "genre b": vocabulary[co.col],
+        "count": co.data,
+        "lift": co.data * stats["n_respondents"] / (counts[co.row] * counts[co.col]),
+        "jaccard": co.data / (counts[co.row] + counts[co.col] - co.data),
+    })
+    frame = frame.sort_values("count", ascending=False, kind="stable").reset_index(drop=True)
+    return frame if top is None else frame.head(top)
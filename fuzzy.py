@@ -0,0 +1,164 @@
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+# =============================================================
+# Rapprochement approché des tokens sans règle
+# =============================================================
+# Un token qu'aucune règle de rules.json ne reconnaît ("teckno",
+# "variete francaise", "you-tube et tv"...) est comparé au vocabulaire du
+# jeu de règles : ses motifs "exact", "prefix" et "substring" et ses
+# valeurs de sortie. Les deux côtés sont comparés sans accents ni casse.
+# Le token prend la valeur du motif le plus proche si
+#   similarité = 1 - distance / longueur de la plus longue chaîne >= seuil
+# où la distance est celle de Damerau-Levenshtein restreinte : insertion,
+# suppression, substitution ou inversion de deux lettres voisines
+# ("spotfiy" -> "spotify" : distance 1). Avec le seuil 0,8, la distance
+# admise est la partie entière de 0,2 x la longueur de la plus longue
+# chaîne : aucune faute jusqu'à 4 lettres, une de 5 à 9, deux de 10 à 14...
+# "spotyfi" (distance 2 de "spotify") n'est donc pas rapproché.
+#
+# Le vocabulaire n'est jamais comparé en entier. Un index inversé de
+# bigrammes de caractères (chaînes bordées d'un caractère de début et de
+# fin) donne, en un np.bincount, le nombre de bigrammes distincts que
+# chaque motif partage avec le token. Une opération d'édition en détruit
+# au plus trois, donc un motif à distance <= k en partage au moins
+#   max(bigrammes distincts du token, du motif) - 3k
+# Seuls les motifs qui passent ce filtre et celui des longueurs sont
+# comparés, avec une distance bornée qui s'arrête dès que k est dépassé.
+# Chaque token est cherché une seule fois : les résultats sont gardés en
+# mémoire (utile en mode --stream, où les mêmes tokens reviennent à chaque
+# morceau).
+
+PAD = "\x02"
+PAD_END = "\x03"
+
+
+def fold(text):
+    """Texte sans accents, en minuscules et aux espaces normalisés."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+
+def bigrams(text):
+    # Bigrammes distincts de la chaîne bordée
+    padded = PAD + text + PAD_END
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def bounded_distance(a, b, k):
+    """Distance de Damerau-Levenshtein restreinte entre a et b si elle est
+    <= k, sinon k + 1. Seule la bande diagonale de largeur k est calculée."""
+    n, m = len(a), len(b)
+    big = k + 1
+    if abs(n - m) > k:
+        return big
+    before = None
+    previous = list(range(m + 1))
+    for i in range(1, n + 1):
+        current = [big] * (m + 1)
+        current[0] = i
+        lo, hi = max(1, i - k), min(m, i + k)
+        best = i if lo == 1 else big
+        char = a[i - 1]
+        for j in range(lo, hi + 1):
+            if char == b[j - 1]:
+                d = previous[j - 1]
+            else:
+                d = previous[j - 1] + 1
+                if previous[j] < d - 1:
+                    d = previous[j] + 1
+                if current[j - 1] < d - 1:
+                    d = current[j - 1] + 1
+                if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1] and before[j - 2] < d - 1:
+                    d = before[j - 2] + 1
+            current[j] = d
+            if d < best:
+                best = d
+        if best > k:
+            return big
+        before, previous = previous, current
+    return min(previous[m], big)
+
+
+def build_index(vocabulary):
+    """Index d'un vocabulaire [(motif, priorité, valeur)].
+
+    Les motifs identiques une fois repliés (accents, casse) gardent la
+    valeur la plus prioritaire.
+    """
+    entries = {}
+    for pattern, priority, value in vocabulary:
+        key = fold(pattern)
+        if key and (key not in entries or priority < entries[key][0]):
+            entries[key] = (priority, value)
+    keys = sorted(entries)
+    postings = defaultdict(list)
+    for i, key in enumerate(keys):
+        for gram in bigrams(key):
+            postings[gram].append(i)
+    return {
+        "keys": keys,
+        "entries": [entries[key] for key in keys],
+        "exact": {key: i for i, key in enumerate(keys)},
+        "postings": {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()},
+        "lengths": np.array([len(key) for key in keys], dtype=np.int64),
+        "n_grams": np.array([len(bigrams(key)) for key in keys], dtype=np.int64),
+    }
+
+
+def best_match(index, token, threshold):
+    """Indice du motif le plus proche de `token` (déjà replié) avec une
+    similarité >= threshold, ou None. À distance égale, le motif le plus
+    prioritaire gagne."""
+    if token in index["exact"]:
+        return index["exact"][token]
+    grams = bigrams(token)
+    hits = [index["postings"][g] for g in grams if g in index["postings"]]
+    if not hits:
+        return None
+    # Bigrammes partagés avec chaque motif, puis filtres vectorisés
+    shared = np.bincount(np.concatenate(hits), minlength=len(index["keys"]))
+    n = len(token)
+    longest = np.maximum(index["lengths"], n)
+    k = ((1 - threshold) * longest + 1e-9).astype(np.int64)
+    candidates = np.flatnonzero((np.abs(index["lengths"] - n) <= k)
+                                & (shared >= np.maximum(index["n_grams"], len(grams)) - 3 * k))
+
+    # Les motifs qui partagent le plus de bigrammes d'abord : une fois un
+    # motif trouvé à distance d, les suivants sont bornés par d
+    candidates = candidates[np.argsort(-shared[candidates], kind="stable")]
+    best, best_rank = None, None
+    for i in candidates:
+        key, limit = index["keys"][i], int(k[i])
+        if best_rank is not None:
+            limit = min(limit, best_rank[0])
+        d = bounded_distance(token, key, limit)
+        if d > limit:
+            continue
+        rank = (d, index["entries"][i][0], key)
+        if best_rank is None or rank < best_rank:
+            best, best_rank = i, rank
+    return best
+
+
+def compile_matcher(vocabulary, threshold=0.8):
+    """Renvoie une fonction token -> valeur du motif le plus proche (ou None).
+
+    Le filtre par bigrammes ne perd aucun candidat tant que le seuil est
+    supérieur à 2/3 (voir l'en-tête du module).
+    """
+    if not 2 / 3 < threshold <= 1:
+        raise ValueError(f"Seuil de similarité hors de ]2/3, 1] : {threshold}")
+    index = build_index(vocabulary)
+    cache = {}
+
+    def match(g):
+        if g not in cache:
+            i = best_match(index, fold(g), threshold)
+            cache[g] = None if i is None else index["entries"][i][1]
+        return cache[g]
+
+    return match
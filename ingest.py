@@ -0,0 +1,228 @@
+import csv
+
+import pandas as pd
+
+# =============================================================
+# Lecture de l'export brut du formulaire, par nom de colonne
+# =============================================================
+# RAW_SCHEMA associe chaque question du formulaire (en-tête français) à
+# son nom dans les données nettoyées et au type lu. Les en-têtes sont
+# comparés sans tenir compte de la casse ni des espaces (l'export en
+# ajoute parfois en fin de question) : un export où les questions ont
+# changé d'ordre est lu correctement, une question absente est une erreur.
+# Les autres colonnes (horodateur, mentions légales, avis sur les
+# recommandations) ne sont jamais analysées.
+#
+# Lecture par pyarrow (plusieurs threads) s'il est installé, sinon par
+# pandas. Les types suivent ce qu'aurait deviné read_csv sur tout le
+# fichier : une colonne "int64" est lue en float64 s'il y manque des
+# valeurs ou si l'une n'est pas entière, en texte si l'une n'est pas un
+# nombre.
+
+RAW_SCHEMA = [
+    ("Préférez-vous des morceaux instrumentaux ou avec paroles ?", "instrumental or vocal music", "string"),
+    ("Sur quel(s) support(s) écoutez-vous de la musique ?", "platform listening", "string"),
+    ("Si vous écoutez la Radio, quelle(s)station(s) écoutez-vous ?", "radio station", "string"),
+    ("Quel est votre genre de musique préféré ?", "music style", "string"),
+    ("Avez-vous une ou plusieurs période(s) musicale(s) favorite(s) ?", "musical period", "string"),
+    ("Parmi les langues suivantes, lesquelles correspondent aux musiques que vous écoutez le plus souvent ?",
+     "language listening", "string"),
+    ("Quel type de paroles préférez-vous ?", "type of singing", "string"),
+    ("À quelle fréquence écoutez-vous des artistes émergents (peu connu) ?",
+     "frequency listening of emerging artist", "int64"),
+    ("Quel tempo préférez-vous en général ? (facultative)", "tempo", "int64"),
+    ("En travaillant / étudiant", "frequency during working", "int64"),
+    ("En faisant du sport", "frequency during exercising", "int64"),
+    ("En cuisinant", "frequency during cooking", "int64"),
+    ("En transport", "frequency during driving", "int64"),
+    ("Pour passer le temps à la maison", "frequency for passing the time", "int64"),
+    ("À quelle fréquence écoutez-vous de la musique ?", "monthly listening frequency", "string"),
+    ("Combien de temps par jour écoutez-vous de la musique ?", "daily listening frequency", "string"),
+    ("Quel est votre genre ?", "gender", "string"),
+    ("Quel âge avez-vous ? (facultatif)", "age", "int64"),
+    ("Dans quel type d'environnement vivez-vous ?", "environment", "string"),
+    ("Quel est votre situation actuelle ?", "professional situation", "string"),
+]
+RAW_NAMES = [name for _, name, _ in RAW_SCHEMA]
+RAW_DTYPES = {name: dtype for _, name, dtype in RAW_SCHEMA}
+TIMESTAMP_HEADER = "Horodateur"
+
+# Valeurs manquantes par défaut de pandas.read_csv (aussi pour pyarrow)
+NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+             "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+
+def _header_key(header):
+    return " ".join(str(header).split()).casefold()
+
+
+def read_header(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f))
+
+
+def match_headers(headers, names=RAW_NAMES):
+    """{nom : en-tête correspondant dans `headers`} pour chaque nom de `names`.
+
+    Un en-tête peut être la question française ou déjà le nom final.
+    """
+    by_key = {_header_key(h): h for h in headers}
+    questions = {name: header for header, name, _ in RAW_SCHEMA}
+    found, missing = {}, []
+    for name in names:
+        question = questions.get(name, name)
+        for key in (_header_key(name), _header_key(question)):
+            if key in by_key:
+                found[name] = by_key[key]
+                break
+        else:
+            missing.append(question)
+    if missing:
+        raise ValueError(f"Questions introuvables dans l'export : {missing}")
+    return found
+
+
+def to_canonical(data):
+    """Renomme et réordonne les colonnes d'un export lu par ailleurs
+    (read_csv...) selon RAW_SCHEMA ; les autres colonnes sont ignorées."""
+    found = match_headers(list(data.columns))
+    headers = [found[name] for name in RAW_NAMES]
+    if list(data.columns) != headers:
+        data = data[headers]
+    data.columns = RAW_NAMES
+    return data
+
+
+def _numeric_or_text(series):
+    # Colonne déclarée numérique lue en texte : int64 / float64 si toutes
+    # les valeurs sont des nombres, sinon texte (comme read_csv)
+    values = pd.to_numeric(series, errors="coerce")
+    return values if values.notna().sum() == series.notna().sum() else series
+
+
+def _kind(dtype):
+    return "string" if dtype == object else str(dtype)
+
+
+def _arrow_options(headers, types):
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    kinds = {"string": pa.string(), "int64": pa.int64(), "float64": pa.float64()}
+    read = pv.ReadOptions(use_threads=True)
+    parse = pv.ParseOptions(newlines_in_values=True)
+    convert = pv.ConvertOptions(include_columns=headers, column_types={h: kinds[t] for h, t in zip(headers, types)},
+                                null_values=NA_VALUES, strings_can_be_null=True, quoted_strings_can_be_null=True)
+    return read, parse, convert
+
+
+def _read_arrow(path, headers, types):
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    try:
+        return pv.read_csv(path, *_arrow_options(headers, types)).to_pandas()
+    except pa.ArrowInvalid:
+        pass
+    # Du texte dans une colonne numérique : relecture en texte, puis
+    # conversion colonne par colonne
+    table = pv.read_csv(path, *_arrow_options(headers, ["string"] * len(headers)))
+    data = table.to_pandas()
+    for h, t in zip(headers, types):
+        if t != "string":
+            data[h] = _numeric_or_text(data[h])
+    return data
+
+
+def _read_pandas(path, headers, types, **kwargs):
+    dtype = {h: (object if t == "string" else t) for h, t in zip(headers, types)}
+    return pd.read_csv(path, usecols=headers, dtype=dtype, keep_default_na=False, na_values=NA_VALUES, **kwargs)
+
+
+def csv_source(path, offset=0):
+    """(source, options de read_csv) pour lire `path` à partir de l'octet
+    `offset` (début d'une ligne après l'en-tête) sans relire le début.
+    Avec offset > 0, la source est un fichier ouvert à fermer."""
+    if not offset:
+        return path, {}
+    f = open(path, "rb")
+    f.seek(offset)
+    return f, {"header": None, "names": read_header(path)}
+
+
+def has_arrow():
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_survey(path="raw_data.csv", names=RAW_NAMES, dtypes=None):
+    """Lit les colonnes `names` de l'export (noms finaux, dans cet ordre).
+
+    `dtypes` ({nom: "int64" | "float64" | "string"}, défaut RAW_DTYPES)
+    donne le type attendu, ex. celui trouvé par survey_dtypes.
+    """
+    dtypes = dict(RAW_DTYPES, **(dtypes or {}))
+    found = match_headers(read_header(path), names)
+    headers = [found[name] for name in names]
+    types = [dtypes.get(name, "string") for name in names]
+    if has_arrow():
+        data = _read_arrow(path, headers, types)
+    else:
+        try:
+            data = _read_pandas(path, headers, types)
+        except ValueError:
+            data = _read_pandas(path, headers, ["string"] * len(headers))
+            for h, t in zip(headers, types):
+                if t != "string":
+                    data[h] = _numeric_or_text(data[h])
+    data = data[headers]
+    data.columns = list(names)
+    return data
+
+
+def iter_survey(path="raw_data.csv", chunksize=100_000, names=RAW_NAMES, dtypes=None, start=0, offset=0):
+    """Comme read_survey, par morceaux de `chunksize` lignes à partir de la
+    ligne `start` (mémoire bornée). Sans `dtypes`, les types sont d'abord
+    cherchés sur tout le fichier (survey_dtypes) : ils ne changent pas
+    d'un morceau à l'autre. Avec `offset` (voir csv_source), la lecture
+    commence à cet octet et `start` compte les lignes à partir de là."""
+    if dtypes is None:
+        dtypes = survey_dtypes(path, chunksize)
+    dtypes = dict(RAW_DTYPES, **dtypes)
+    found = match_headers(read_header(path), names)
+    headers = [found[name] for name in names]
+    types = [dtypes.get(name, "string") for name in names]
+    source, options = csv_source(path, offset)
+    try:
+        row = 0
+        for chunk in _read_pandas(source, headers, types, chunksize=chunksize, **options):
+            n_rows = len(chunk)
+            if row + n_rows > start:
+                chunk = chunk.iloc[max(0, start - row):][headers]
+                chunk.columns = list(names)
+                yield chunk
+            row += n_rows
+    finally:
+        if offset:
+            source.close()
+
+
+def survey_dtypes(path="raw_data.csv", chunksize=100_000, dtypes=None, start=0, offset=0):
+    """Type de chaque colonne sur tout le fichier, comme l'aurait deviné
+    read_csv : "int64", "float64" (valeurs manquantes ou non entières) ou
+    "string". Seules les colonnes numériques sont lues, par morceaux.
+
+    Avec `dtypes` (types des lignes précédentes), seules les lignes à
+    partir de `start` / `offset` sont lues (voir iter_survey).
+    """
+    numeric = [name for name in RAW_NAMES if RAW_DTYPES[name] != "string"]
+    dtypes = dict(RAW_DTYPES, **(dtypes or {}))
+    rank = {"int64": 0, "float64": 1, "string": 2}
+    for chunk in iter_survey(path, chunksize, numeric, dict.fromkeys(numeric, "string"), start, offset):
+        for name in numeric:
+            kind = _kind(_numeric_or_text(chunk[name]).dtype)
+            dtypes[name] = max(dtypes[name], kind, key=rank.get)
+    return dtypes
@@ -1,17 +1,13 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
-import re
+from ingest import read_survey
 
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
 
-data = pd.read_csv('raw_data.csv')
-# Supprime les 3 premières colonnes ["Horodateur", "Nom d'utilisateur", "Mentions légales"]
-data = data.drop(columns=data.columns[:3])
-# Supprime les dernières colonnes qui concerne les avis sur le futur developpement de l'application
-data = data.drop(columns=data.columns[20:])
+def load_raw(path='raw_data.csv'):
+    # Les 20 questions analysées, repérées par leur intitulé (voir ingest.py) :
+    # plus de suppression des colonnes par position
+    return read_survey(path)
+
 
 def data_clean(data):
     femme, homme = 0, 0
@@ -86,4 +82,6 @@ def data_clean(data):
 
     return data
 
-data_clean(data)
+# Lancement
+if __name__ == "__main__":
+    data_clean(load_raw())
@@ -1,19 +1,13 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
-import re
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
+from ingest import read_survey
+from normalize import is_absurd_genre, normalize_genre
 
-# Chargement des données brutes
-data = pd.read_csv('raw_data.csv')
+def load_raw(path='raw_data.csv'):
+    # Les 20 questions analysées, repérées par leur intitulé (voir ingest.py) :
+    # plus de suppression des colonnes par position
+    return read_survey(path)
 
-# Supprime les 3 premières colonnes ["Horodateur", "Nom d'utilisateur", "Mentions légales"]
-data = data.drop(columns=data.columns[:3])
-
-# Supprime les colonnes concernant les avis (après la 20ᵉ)
-data = data.drop(columns=data.columns[20:])
 
 def data_clean(data):
 
@@ -97,29 +91,14 @@ def data_clean(data):
     # ======================================================
     # 4) SUPPRESSION PARTIELLE DES GENRES ABSURDES
     # ======================================================
-    motifs_a_supprimer = [
-        "je ne peux pas me satisfaire",
-        "je n'écoute que rarement",
-        "rap anglais des années 90",
-        "musique de dépression",
-        "sokuuu",
-        "années",
-        "60", "70", "80", "90", "2000", 
-        "etc)",
-        "2015",
-        "avec des textes"
-    ]
-
-    escaped = [re.escape(m) for m in motifs_a_supprimer]
-    pattern = "(" + "|".join(escaped) + ")"
-
+    # Motifs partagés avec cleaner.py : voir ABSURD_GENRES dans normalize.py
     def clean_absurd_genres(value):
         if not isinstance(value, str):
             return np.nan
         genres = [g.strip() for g in value.split(";")]
         cleaned = []
         for g in genres:
-            if re.search(pattern, g, flags=re.IGNORECASE):
+            if is_absurd_genre(g):
                 continue
             cleaned.append(g)
         if len(cleaned) == 0:
@@ -132,64 +111,7 @@ def data_clean(data):
     # ======================================================
     # 5) FUSION / NORMALISATION DES GENRES
     # ======================================================
-    def normalize_genre(g):
-        if not isinstance(g, str):
-            return None
-        g = g.lower().strip()
-
-        # Pop regroupée
-        if g in ["k-pop", "j-pop", "dream pop"]:
-            return "pop"
-
-        # Variété française
-        if g in ["variété française", "variete française", "chanson française à texte", "chanson francaise"]:
-            return "french variety"
-
-        # Métal / Metal
-        if "metal" in g or "métal" in g:
-            return "metal"
-
-        # Rock & dérivés
-        if g in [
-            "hard rock", "rock prog", "indie rock", "alt rock",
-            "rock progressif", "rock'n'roll", "rock n roll", "rock and roll", "alternative", "gothique", "indie", "musique alternative"
-        ] or g.startswith("rock"):
-            return "rock"
-
-        # Electro variations
-        if g in ["electro chill et populaires", "electro populaire", "electrique", "drum and bass", "breakcore", "dubstep", "chiptune", "dance", "vocaloid", "house"]:
-            return "electro"
-        
-        # rap
-        if g in ["r&b", "hip-hop"]:
-            return "rap"
-        
-        # jazz
-        if g in ["soul", "blues"]:
-            return "jazz"
-
-        # folk
-        if g in ["musique du monde", "reggae", "celtique", "shatta"]:
-            return "folk"
-        
-        # ost
-        if g in ["musique de jeux"]:
-            return "ost"
-        
-        #eclectique
-        if g in ["indépendant divers", "éclectique"]:
-            return "eclectic"
-
-        # Aucun → pas de préférences
-        if g in ["aucun préféré", "aucun", "aucun preference", "aucune idée", "pas de préférences"]:
-            return "no preferences"
-
-        # Musique classique en anglais        
-        if g in ["musique classique"]:
-            return "classical music"
-
-        return g
-
+    # Règles partagées avec cleaner.py : voir rules.json
     def apply_genre_normalization(value):
         if not isinstance(value, str):
             return np.nan
@@ -241,4 +163,5 @@ def data_clean(data):
 
 
 # Lancement
-cleaned = data_clean(data)
+if __name__ == "__main__":
+    data_clean(load_raw())
@@ -0,0 +1,208 @@
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from schema import is_stale, load_cleaned, next_part_path, part_paths, remove_parts
+
+# =============================================================
+# Matrices indicatrices creuses (multi-hot) des réponses multiples
+# =============================================================
+# Chaque colonne "a;b;c" devient une matrice CSR (répondants x réponses)
+# avec un 1 par réponse cochée. Le vocabulaire (ordre des colonnes) est
+# stable : on repart du vocabulaire déjà enregistré et les nouvelles
+# réponses sont ajoutées à la fin, triées.
+#
+# Fichiers : cleaned_data.csv -> cleaned_data.music_style.npz, etc.
+#
+# L'écriture se fait morceau par morceau (open_multihot_writer) : les
+# indices et indptr de chaque morceau vont dans deux fichiers temporaires,
+# puis sont recopiés par blocs dans le .npz, colonnes renumérotées au
+# passage. La mémoire ne dépend pas du nombre de lignes (mode --stream).
+# Le mode incrémental écrit les nouvelles lignes dans une partie
+# (cleaned_data.music_style.part1.npz, ...) : load_multihot les recolle.
+# Comme le Parquet (schema.load_cleaned), un .npz plus ancien que le CSV
+# (CSV réécrit par main.py, mato.py...) n'est pas lu : current_multihot
+# réencode alors la colonne du CSV.
+
+MULTI_VALUED_COLUMNS = ["music style", "platform listening", "radio station", "musical period", "language listening"]
+
+
+def multihot_path(csv_path, column):
+    root, _ = os.path.splitext(csv_path)
+    return f"{root}.{column.replace(' ', '_')}.npz"
+
+
+def encode_multihot(series, vocabulary=None, sep=";"):
+    """Encode une colonne "a;b;c" en matrice CSR.
+
+    Renvoie (matrice, vocabulaire) ; le vocabulaire donné est complété par
+    les réponses inconnues, jamais réordonné.
+    """
+    vocabulary = list(vocabulary) if vocabulary is not None else []
+    index = {v: i for i, v in enumerate(vocabulary)}
+
+    # Découpage une seule fois par cellule distincte
+    cell_codes, cells = pd.factorize(series.to_numpy(dtype=object))
+    cell_tokens = [list(dict.fromkeys(t for t in c.split(sep) if t)) if isinstance(c, str) else []
+                   for c in cells]
+    new = sorted({t for tokens in cell_tokens for t in tokens} - index.keys())
+    for t in new:
+        index[t] = len(vocabulary)
+        vocabulary.append(t)
+    # Colonnes de chaque cellule distincte, à plat (+ une cellule vide
+    # en dernière position pour le code -1 des NaN)
+    cell_counts = np.array([len(t) for t in cell_tokens] + [0], dtype=np.int64)
+    cell_starts = np.concatenate([[0], np.cumsum(cell_counts)[:-1]])
+    cell_flat = np.array([index[t] for tokens in cell_tokens for t in tokens], dtype=np.int32)
+
+    # Rediffusion vers les lignes sans boucle Python
+    counts = cell_counts[cell_codes]
+    indptr = np.zeros(len(series) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    positions = np.repeat(cell_starts[cell_codes] - indptr[:-1], counts) + np.arange(indptr[-1])
+    indices = cell_flat[positions]
+    data = np.ones(len(indices), dtype=np.uint8)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(series), len(vocabulary)))
+    return matrix, vocabulary
+
+
+# -------------------------------------------------------------
+# Écriture morceau par morceau
+# -------------------------------------------------------------
+COPY_BLOCK = 1 << 20   # valeurs recopiées à la fois vers le .npz
+
+
+def open_multihot_writer(path, append=False):
+    """Écrivain de matrice multi-hot pour `path`, à compléter par
+    write_multihot puis fermer par close_multihot. Le vocabulaire part de
+    celui déjà enregistré ; avec append=True, les lignes vont dans une
+    nouvelle partie, sinon la matrice est réécrite."""
+    vocabulary = load_vocabulary(path) or []
+    if not append:
+        remove_parts(path)
+    path = next_part_path(path) if append else path
+    return {
+        "path": path,
+        "vocabulary": vocabulary,
+        "n_stable": len(vocabulary),
+        "rows": 0,
+        "nnz": 0,
+        "indices": open(path + ".indices.tmp", "wb"),
+        "indptr": open(path + ".indptr.tmp", "wb"),
+    }
+
+
+def write_multihot(writer, series):
+    # Encode un morceau et l'ajoute aux fichiers temporaires
+    block, writer["vocabulary"] = encode_multihot(series, writer["vocabulary"])
+    block.indices.astype(np.int32).tofile(writer["indices"])
+    (block.indptr[1:].astype(np.int64) + writer["nnz"]).tofile(writer["indptr"])
+    writer["rows"] += block.shape[0]
+    writer["nnz"] += block.nnz
+
+
+def close_multihot(writer):
+    """Écrit le .npz : réponses apparues après les n_stable premières
+    triées (même vocabulaire qu'un encodage en une fois), colonnes
+    renumérotées bloc par bloc."""
+    for name in ("indices", "indptr"):
+        writer[name].close()
+    vocabulary, n_stable = writer["vocabulary"], writer["n_stable"]
+    order = list(range(n_stable)) + sorted(range(n_stable, len(vocabulary)), key=lambda i: vocabulary[i])
+    renumber = np.empty(len(vocabulary), dtype=np.int32)
+    renumber[order] = np.arange(len(vocabulary), dtype=np.int32)
+
+    path = writer["path"]
+    indices_path, indptr_path = path + ".indices.tmp", path + ".indptr.tmp"
+    tmp = path + ".tmp"
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        _write_npy(archive, "indices", np.int32, writer["nnz"],
+                   (renumber[block] for block in _read_blocks(indices_path, np.int32)))
+        _write_npy(archive, "indptr", np.int64, writer["rows"] + 1,
+                   [np.zeros(1, dtype=np.int64)] + list(_read_blocks(indptr_path, np.int64)))
+        _write_npy(archive, "shape", np.int64, 2, [np.array([writer["rows"], len(vocabulary)])])
+        names = np.array([vocabulary[i] for i in order], dtype=str)
+        _write_npy(archive, "vocabulary", names.dtype, len(names), [names])
+    os.replace(tmp, path)
+    os.remove(indices_path)
+    os.remove(indptr_path)
+
+
+def _read_blocks(path, dtype):
+    with open(path, "rb") as f:
+        while True:
+            block = np.fromfile(f, dtype=dtype, count=COPY_BLOCK)
+            if not len(block):
+                return
+            yield block
+
+
+def _write_npy(archive, name, dtype, length, blocks):
+    # Tableau 1-D au format .npy écrit bloc par bloc dans l'archive
+    dtype = np.dtype(dtype)
+    with archive.open(name + ".npy", "w", force_zip64=True) as f:
+        np.lib.format.write_array_header_1_0(
+            f, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (length,)})
+        for block in blocks:
+            f.write(np.ascontiguousarray(block, dtype=dtype).tobytes())
+
+
+def load_multihot(path, start=0):
+    """Renvoie (matrice CSR, vocabulaire) écrits par close_multihot, parties
+    comprises (les premières ont moins de colonnes : complétées à droite).
+
+    Avec `start`, seules les lignes start, start + 1... sont renvoyées ;
+    les parties qui se terminent avant ne sont pas lues.
+    """
+    vocabulary = load_vocabulary(path)
+    blocks, row = [], 0
+    for part in part_paths(path):
+        with np.load(part) as f:
+            n_rows = int(f["shape"][0])
+            if row + n_rows > start:
+                skip = max(0, start - row)
+                indices, indptr = f["indices"], f["indptr"]
+                indices, indptr = indices[indptr[skip]:], indptr[skip:] - indptr[skip]
+                data = np.ones(len(indices), dtype=np.uint8)
+                blocks.append(sparse.csr_matrix((data, indices, indptr), shape=(n_rows - skip, len(vocabulary))))
+        row += n_rows
+    if not blocks:
+        return sparse.csr_matrix((0, len(vocabulary)), dtype=np.uint8), vocabulary
+    matrix = blocks[0] if len(blocks) == 1 else sparse.vstack(blocks, format="csr")
+    return matrix, vocabulary
+
+
+def current_multihot(csv_path, column, start=0, series=None, vocabulary=None):
+    """(matrice CSR, vocabulaire) de `column`, lignes start, start + 1...
+
+    Lus dans le .npz s'il existe et n'est pas plus ancien que csv_path ;
+    sinon encodés à partir de `series` (la colonne déjà chargée, mêmes
+    lignes) ou du fichier nettoyé, en complétant `vocabulary`.
+    """
+    path = multihot_path(csv_path, column)
+    parts = part_paths(path)
+    if parts and not is_stale(parts, csv_path):
+        return load_multihot(path, start)
+    if series is None:
+        series = load_cleaned(columns=[column], csv_path=csv_path, start=start)[column]
+    return encode_multihot(series, vocabulary)
+
+
+def load_vocabulary(path):
+    # Vocabulaire complet : celui de la dernière partie
+    parts = part_paths(path)
+    if not parts:
+        return None
+    with np.load(parts[-1]) as f:
+        return list(f["vocabulary"])
+
+
+def export_multihot(data, csv_path, columns=MULTI_VALUED_COLUMNS):
+    # Écrit une matrice par colonne à côté du CSV
+    for col in columns:
+        writer = open_multihot_writer(multihot_path(csv_path, col))
+        write_multihot(writer, data[col])
+        close_multihot(writer)
@@ -0,0 +1,157 @@
+import numpy as np
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+from analyse import QUANT_COLUMNS
+from multihot import current_multihot
+from schema import load_cleaned
+from wide_pca import column_stats, randomized_pca, standard_scale
+
+# =============================================================
+# "Des gens comme vous" : plus proches voisins entre répondants
+# =============================================================
+# Chaque répondant est plongé dans un petit espace (EMBEDDING_DIMS axes) :
+# ACP de [variables quantitatives centrées-réduites | indicatrices genres,
+# langues, périodes]. Un arbre k-d (scipy cKDTree) sur ces coordonnées
+# répond aux requêtes "k répondants les plus proches" par lots. Par défaut
+# la recherche est approchée (eps = APPROX_EPS : chaque voisin rendu est au
+# plus (1 + eps) fois plus loin que le vrai) ; eps=0 pour une recherche exacte.
+#
+# Les nouvelles réponses sont plongées avec le même modèle et placées
+# dans un tampon parcouru en force brute ; l'arbre n'est reconstruit que
+# lorsque le tampon dépasse une fraction de sa taille.
+
+EMBEDDING_COLUMNS = ["music style", "language listening", "musical period"]
+EMBEDDING_DIMS = 16
+APPROX_EPS = 0.5
+
+
+def respondent_features(csv_path="cleaned_data.csv", start=0, quant_mean=None, vocabularies=None,
+                        columns=EMBEDDING_COLUMNS):
+    """Matrice creuse [quantitatives | indicatrices] des répondants start, start+1...
+
+    Les âges/tempos manquants sont remplacés par quant_mean (moyenne des
+    données si None). Avec `vocabularies`, les indicatrices sont limitées
+    aux réponses connues du modèle. Renvoie (matrice, moyennes, vocabulaires).
+    """
+    # Seules les lignes à partir de `start` sont lues (groupes de lignes
+    # Parquet, parties et lignes des matrices multi-hot)
+    quant = load_cleaned(columns=QUANT_COLUMNS, csv_path=csv_path, start=start).astype(float)
+    quant_mean = quant.mean().to_numpy() if quant_mean is None else quant_mean
+    blocks = [sparse.csr_matrix(quant.fillna(dict(zip(QUANT_COLUMNS, quant_mean))).to_numpy())]
+    found = {}
+    for col in columns:
+        known = None if vocabularies is None else vocabularies[col]
+        matrix, vocabulary = current_multihot(csv_path, col, start, vocabulary=known)
+        if vocabularies is not None:
+            # Vocabulaire stable : les réponses connues sont en tête
+            vocabulary = vocabulary[:len(vocabularies[col])]
+            matrix = matrix[:, :len(vocabulary)]
+        blocks.append(matrix.astype(float))
+        found[col] = vocabulary
+    return sparse.hstack(blocks, format="csr"), quant_mean, found
+
+
+def fit_embedding(csv_path="cleaned_data.csv", dims=EMBEDDING_DIMS):
+    """Ajuste le plongement sur les données nettoyées.
+
+    Renvoie (modèle, coordonnées float32 de chaque répondant).
+    """
+    x, quant_mean, vocabularies = respondent_features(csv_path)
+    mean, std = column_stats(x)
+    pca = randomized_pca(x, n_components=min(dims, min(x.shape)))
+    model = {
+        "quant_mean": quant_mean,
+        "vocabularies": vocabularies,
+        "mean": mean,
+        "scale": standard_scale(std),
+        "components": pca["components"],
+    }
+    return model, embed(model, x)
+
+
+def embed(model, x):
+    # Coordonnées de lignes (creuses) dans l'espace du modèle
+    projection = model["scale"][:, None] * model["components"].T
+    return np.asarray(x @ projection - model["mean"] @ projection, dtype=np.float32)
+
+
+def embed_new(model, csv_path="cleaned_data.csv", start=0):
+    """Plonge les répondants à partir de la ligne `start` (nouvelles réponses)."""
+    x, _, _ = respondent_features(csv_path, start, model["quant_mean"], model["vocabularies"])
+    return embed(model, x)
+
+
+# =============================================================
+# Index des plus proches voisins
+# =============================================================
+# index = {"tree": arbre des lignes 0..n_tree-1, "pending": coordonnées
+# des lignes n_tree.., pas encore dans l'arbre}. Les identifiants sont les
+# numéros de ligne dans le fichier nettoyé.
+
+def build_index(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return {
+        "tree": cKDTree(embeddings),
+        "pending": np.empty((0, embeddings.shape[1]), dtype=np.float32),
+    }
+
+
+def index_size(index):
+    return index["tree"].n + len(index["pending"])
+
+
+def add_to_index(index, embeddings, rebuild_ratio=0.05, min_rebuild=10_000):
+    """Ajoute des répondants (identifiants à la suite des existants)."""
+    index["pending"] = np.vstack([index["pending"], np.asarray(embeddings, dtype=np.float32)])
+    if len(index["pending"]) > max(min_rebuild, rebuild_ratio * index["tree"].n):
+        rebuilt = build_index(np.vstack([index["tree"].data, index["pending"]]))
+        index.update(rebuilt)
+    return index
+
+
+def query_index(index, queries, k=10, eps=APPROX_EPS, workers=-1):
+    """k plus proches répondants de chaque requête : (distances, identifiants),
+    tableaux (requêtes, k) triés par distance croissante."""
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    k = min(k, index_size(index))
+    tree, pending = index["tree"], index["pending"]
+    dist, ids = tree.query(queries, k=min(k, tree.n), eps=eps, workers=workers)
+    dist, ids = dist.reshape(len(queries), -1), ids.reshape(len(queries), -1)
+    if len(pending) == 0:
+        return dist, ids
+
+    # Tampon en force brute, puis fusion des deux listes
+    d2 = (queries ** 2).sum(axis=1)[:, None] + (pending ** 2).sum(axis=1)[None, :] - 2 * queries @ pending.T
+    near = np.argpartition(d2, k - 1, axis=1)[:, :k] if len(pending) > k else \
+        np.broadcast_to(np.arange(len(pending)), d2.shape)
+    dist = np.hstack([dist, np.sqrt(np.maximum(np.take_along_axis(d2, near, axis=1), 0))])
+    ids = np.hstack([ids, tree.n + near])
+    best = np.argsort(dist, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(dist, best, axis=1), np.take_along_axis(ids, best, axis=1)
+
+
+def index_points(index, ids):
+    # Coordonnées des répondants `ids`
+    ids = np.asarray(ids)
+    n_tree = index["tree"].n
+    in_tree = ids < n_tree
+    points = np.empty((len(ids), index["pending"].shape[1]), dtype=np.float32)
+    points[in_tree] = index["tree"].data[ids[in_tree]]
+    points[~in_tree] = index["pending"][ids[~in_tree] - n_tree]
+    return points
+
+
+def similar_respondents(index, ids, k=10, eps=APPROX_EPS, workers=-1):
+    """Pour chaque répondant de `ids`, les k autres répondants les plus
+    proches : (distances, identifiants) de forme (len(ids), k)."""
+    ids = np.atleast_1d(ids)
+    dist, found = query_index(index, index_points(index, ids), k + 1, eps, workers)
+    # Retire le répondant lui-même (ou, en cas de doublons exacts, le
+    # dernier voisin) pour garder k voisins
+    is_self = found == ids[:, None]
+    drop = np.where(is_self.any(axis=1), is_self.argmax(axis=1), found.shape[1] - 1)
+    keep = np.ones(found.shape, dtype=bool)
+    keep[np.arange(len(ids)), drop] = False
+    n_keep = found.shape[1] - 1
+    return dist[keep].reshape(len(ids), n_keep), found[keep].reshape(len(ids), n_keep)
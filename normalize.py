@@ -0,0 +1,151 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from rules import compile_token_filter, load_rule_specs, load_rules
+from schema import distinct_to_categorical
+
+# =============================================================
+# Normalisation des colonnes à choix multiples ("a;b;c")
+# =============================================================
+# Les colonnes comme "music style" ou "platform listening" contiennent
+# quelques centaines de réponses distinctes pour des milliers de lignes.
+# Plutôt que d'appeler une fonction Python sur chaque cellule, on :
+#   1) découpe la colonne une seule fois (str.split + explode),
+#   2) normalise uniquement les tokens distincts,
+#   3) réassemble les cellules en gardant l'ordre et sans doublons.
+
+
+# -------------------------------------------------------------
+# Nettoyage des colonnes texte
+# -------------------------------------------------------------
+SEPARATORS = re.compile(r'\s*[\/,;]\s*')
+PARENTHESES = re.compile(r'\s*([()])\s*')
+
+
+def clean_text(value):
+    # "Mot / mot , mot" -> "mot;mot;mot" et "a ( b )" -> "a(b)"
+    value = SEPARATORS.sub(';', value)
+    value = PARENTHESES.sub(r'\1', value)
+    return value.strip().lower()
+
+
+def clean_text_column(series, mapping=None, default=None, categories=None):
+    """Nettoie une colonne texte en un seul passage sur les lignes.
+
+    Le nettoyage (clean_text) et la traduction ne sont faits que sur les
+    valeurs distinctes. Avec un mapping, les cellules vides valent "nan"
+    comme avec astype(str) ; une valeur absente du mapping prend `default`,
+    ou est conservée si `default` vaut None. Le résultat est catégoriel
+    (voir distinct_to_categorical pour `categories`).
+    """
+    codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+    # Dernière position = cellules vides (code -1 de factorize)
+    cleaned = [clean_text(u) if isinstance(u, str) else np.nan for u in uniques] + [np.nan]
+    if mapping is not None:
+        cleaned = [v if isinstance(v, str) else "nan" for v in cleaned]
+        cleaned = [mapping.get(v, v if default is None else default) for v in cleaned]
+    return distinct_to_categorical(cleaned, codes, series, categories)
+
+
+def map_values(series, mapping):
+    # Comme series.replace(mapping), mais sans conversion implicite du type :
+    # le résultat (et donc le CSV) ne dépend pas des autres lignes du morceau.
+    codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+    mapped = [mapping.get(u, u) for u in uniques] + [np.nan]
+    return pd.Series(np.asarray(mapped, dtype=object)[codes], index=series.index, name=series.name)
+
+
+# -------------------------------------------------------------
+# Normalisation des tokens : règles compilées depuis rules.json
+# -------------------------------------------------------------
+# Pour ajouter un nouveau genre / une nouvelle plateforme, modifier
+# rules.json (voir rules.py pour le format).
+RULE_SPECS = load_rule_specs()
+RULES = load_rules(specs=RULE_SPECS)
+
+normalize_platform = RULES["platform"]
+normalize_language = RULES["language"]
+normalize_musical_period = RULES["musical_period"]
+normalize_genre = RULES["genre"]
+
+
+# -------------------------------------------------------------
+# Genres absurdes à supprimer (sous-chaînes, casse ignorée)
+# -------------------------------------------------------------
+ABSURD_GENRES = [
+    "je ne peux pas me satisfaire",
+    "je n'écoute que rarement",
+    "rap anglais des années 90",
+    "musique de dépression",
+    "sokuuu",
+    "années",
+    "60", "70", "80", "90", "2000",
+    "etc)",
+    "2015",
+    "avec des textes"
+]
+
+is_absurd_genre = compile_token_filter(ABSURD_GENRES)
+
+
+def normalize_genre_or_drop(g):
+    # Filtre des genres absurdes puis normalisation, token par token
+    if is_absurd_genre(g):
+        return None
+    return normalize_genre(g)
+
+
+# -------------------------------------------------------------
+# Moteur vectorisé
+# -------------------------------------------------------------
+def normalize_multi_valued(series, normalize_token, sep=";"):
+    """Normalise une colonne "a;b;c" en n'appelant normalize_token qu'une
+    fois par token distinct.
+
+    Mêmes valeurs que l'ancien apply() cellule par cellule : les tokens
+    vides ou sans correspondance sont retirés, les doublons sont supprimés
+    en gardant la première occurrence et une cellule vide devient NaN.
+    """
+    # Les mêmes combinaisons de réponses reviennent très souvent : on ne
+    # travaille que sur les cellules distinctes puis on rediffuse (codes
+    # d'une colonne catégorielle).
+    cell_codes, cells = pd.factorize(series.to_numpy(dtype=object))
+    cleaned = _normalize_cells(pd.Series(cells, dtype=object), normalize_token, sep)
+    return distinct_to_categorical(np.append(cleaned, np.nan), cell_codes, series)
+
+
+def _normalize_cells(cells, normalize_token, sep):
+    result = np.full(len(cells), np.nan, dtype=object)
+
+    # 1) Découpage unique : une ligne par token, index = position de la cellule
+    tokens = cells.str.split(sep).explode()
+    tokens = tokens[tokens.notna()].str.strip()
+
+    # 2) Normalisation des seuls tokens distincts
+    codes, uniques = pd.factorize(tokens)
+    normalized = [normalize_token(u) for u in uniques]
+    norm_codes, norm_uniques = pd.factorize(
+        pd.Series([n if n else None for n in normalized], dtype=object)
+    )
+    token_codes = norm_codes[codes]
+
+    # 3) Suppression des tokens vides et des doublons (ordre conservé)
+    pairs = pd.DataFrame({"row": tokens.index.to_numpy(), "code": token_codes})
+    pairs = pairs[pairs["code"] >= 0].drop_duplicates()
+    if pairs.empty:
+        return result
+
+    # 4) Réassemblage : on concatène le k-ième token de chaque cellule
+    rows = pairs["row"].to_numpy()
+    words = np.asarray(norm_uniques, dtype=object)[pairs["code"].to_numpy()]
+    rank = pairs.groupby("row").cumcount().to_numpy()
+
+    first = rank == 0
+    result[rows[first]] = words[first]
+    for k in range(1, rank.max() + 1):
+        at_k = rank == k
+        result[rows[at_k]] = result[rows[at_k]] + sep + words[at_k]
+
+    return result
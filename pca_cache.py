@@ -0,0 +1,56 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+
+# =============================================================
+# Cache disque des résultats d'ACP
+# =============================================================
+# Un résultat (axes, variances, coordonnées) est rangé sous l'empreinte de
+# la matrice d'entrée et des paramètres : relancer l'analyse ou le rapport
+# sur des données inchangées ne refait pas la décomposition.
+#
+# Fichiers : cleaned_data.csv -> cleaned_data.pca/<empreinte>.npz
+
+PCA_KEYS = ["components", "explained_variance", "explained_variance_ratio", "scores"]
+
+
+def pca_cache_dir(csv_path):
+    return os.path.splitext(csv_path)[0] + ".pca"
+
+
+def matrix_digest(x, params):
+    """Empreinte sha256 d'une matrice (dense ou creuse) et des paramètres."""
+    h = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+    if sparse.issparse(x):
+        x = x.tocsr()
+        parts = [x.data.astype(np.float64), x.indices.astype(np.int64), x.indptr.astype(np.int64)]
+    else:
+        parts = [np.asarray(x, dtype=np.float64)]
+    h.update(repr(x.shape).encode())
+    for part in parts:
+        h.update(np.ascontiguousarray(part).tobytes())
+    return h.hexdigest()
+
+
+def cached_pca(x, fit, params, cache_dir):
+    """Renvoie fit(x) (dict avec PCA_KEYS), lu depuis cache_dir si possible.
+
+    `params` doit décrire tout ce qui change le résultat (méthode, nombre
+    d'axes, graine...) : il entre dans l'empreinte.
+    """
+    path = os.path.join(cache_dir, matrix_digest(x, params) + ".npz")
+    if os.path.exists(path):
+        with np.load(path) as f:
+            return {k: f[k] for k in PCA_KEYS}
+
+    res = fit(x)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Écriture dans un fichier temporaire puis renommage : un autre
+    # processus ne lit jamais un fichier à moitié écrit
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, **{k: res[k] for k in PCA_KEYS})
+    os.replace(tmp, path)
+    return res
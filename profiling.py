@@ -0,0 +1,159 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+import pandas as pd
+
+# =============================================================
+# Instrumentation des étapes du nettoyage
+# =============================================================
+# data_clean découpe son travail en étapes nommées (renommage, texte,
+# traductions, normalisations, mappings numériques, export...). Quand
+# l'instrumentation est active, chaque étape mesure :
+#   wall_s / cpu_s : durée réelle et temps CPU du processus
+#   peak_mb        : pic de mémoire allouée pendant l'étape (tracemalloc,
+#                    numpy et pandas compris ; désactivable avec memory=False)
+#   rss_mb         : mémoire résidente du processus à la fin de l'étape
+#   rows_in/out    : lignes avant/après l'étape
+#   tokens_in/out  : réponses "a;b;c" de la colonne traitée, avant/après
+# Les mesures d'une même étape (plusieurs morceaux en mode --stream) sont
+# additionnées dans le rapport ; chaque mesure est aussi transmise aux
+# hooks, ex. pour l'envoyer à un collecteur :
+#
+#   start_profile(hooks=[lambda record: collector.send(record)])
+#   data_clean(read_raw())
+#   write_report(stop_profile(), "profile.json")
+#
+# Désactivée (par défaut), stage() renvoie un contexte vide partagé : un
+# test de variable globale par étape, rien d'autre. Les étapes ne
+# s'imbriquent pas ; en mode --workers, les morceaux nettoyés dans les
+# processus fils ne sont pas mesurés.
+
+_session = None
+_OFF = nullcontext()
+
+
+def start_profile(memory=True, hooks=()):
+    """Active l'instrumentation (et tracemalloc si memory=True)."""
+    global _session
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _session = {
+        "memory": memory,
+        "started_tracing": started_tracing,
+        "hooks": list(hooks),
+        "stages": {},
+        "t0": time.perf_counter(),
+        "c0": time.process_time(),
+    }
+
+
+def stop_profile():
+    """Désactive l'instrumentation et renvoie le rapport."""
+    global _session
+    session, _session = _session, None
+    if session is None:
+        return None
+    if session["started_tracing"]:
+        tracemalloc.stop()
+    return {
+        "wall_s": time.perf_counter() - session["t0"],
+        "cpu_s": time.process_time() - session["c0"],
+        "stages": session["stages"],
+    }
+
+
+def is_profiling():
+    return _session is not None
+
+
+def add_hook(hook):
+    # hook(record) est appelé à la fin de chaque étape
+    if _session is not None:
+        _session["hooks"].append(hook)
+
+
+def count_tokens(series, sep=";"):
+    # Nombre de réponses dans une colonne "a;b;c" (cellules vides exclues),
+    # compté sur les cellules distinctes comme dans normalize.py
+    codes, cells = pd.factorize(series.to_numpy(dtype=object))
+    per_cell = np.array([c.count(sep) + 1 if isinstance(c, str) and c else 0 for c in cells], dtype=np.int64)
+    return int(np.bincount(codes[codes >= 0], minlength=len(cells)) @ per_cell)
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return None
+
+
+def stage(name, data=None, column=None):
+    """Contexte qui mesure l'étape `name`.
+
+    `data` (DataFrame, lu à l'entrée et à la sortie) donne les effectifs
+    de lignes ; `column` ceux des réponses de cette colonne.
+    """
+    if _session is None:
+        return _OFF
+    return _measure(name, data, column)
+
+
+@contextmanager
+def _measure(name, data, column):
+    record = {"stage": name}
+    if data is not None:
+        record["rows_in"] = len(data)
+        if column is not None:
+            record["tokens_in"] = count_tokens(data[column])
+    if _session["memory"]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    t0, c0 = time.perf_counter(), time.process_time()
+    yield record
+    record["wall_s"] = time.perf_counter() - t0
+    record["cpu_s"] = time.process_time() - c0
+    if _session["memory"]:
+        record["peak_mb"] = (tracemalloc.get_traced_memory()[1] - base) / 2 ** 20
+    record["rss_mb"] = _rss_mb()
+    if data is not None:
+        record["rows_out"] = len(data)
+        if column is not None:
+            record["tokens_out"] = count_tokens(data[column])
+    _record(record)
+
+
+def _record(record):
+    total = _session["stages"].setdefault(record["stage"], {"calls": 0})
+    total["calls"] += 1
+    for key, value in record.items():
+        if key == "stage" or value is None:
+            continue
+        if key in ("peak_mb", "rss_mb"):
+            total[key] = max(total.get(key, 0), value)
+        else:
+            total[key] = total.get(key, 0) + value
+    for hook in _session["hooks"]:
+        hook(record)
+
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{path} created successfully ✅")
+
+
+def print_report(report):
+    # Tableau lisible, étapes dans l'ordre d'exécution
+    print(f"{'étape':<22}{'appels':>7}{'temps':>10}{'cpu':>10}{'pic Mo':>10}{'lignes':>11}{'réponses':>22}")
+    for name, s in report["stages"].items():
+        tokens = f"{s['tokens_in']} -> {s['tokens_out']}" if "tokens_in" in s else ""
+        peak = f"{s['peak_mb']:.1f}" if "peak_mb" in s else ""
+        print(f"{name:<22}{s['calls']:>7}{s['wall_s']:>9.3f}s{s['cpu_s']:>9.3f}s{peak:>10}"
+              f"{s.get('rows_out', ''):>11}{tokens:>22}")
+    print(f"{'total':<22}{'':>7}{report['wall_s']:>9.3f}s{report['cpu_s']:>9.3f}s")
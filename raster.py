@@ -0,0 +1,55 @@
+import numpy as np
+
+# =============================================================
+# Rendu "rastérisé" des nuages de points
+# =============================================================
+# Au lieu de donner chaque point à matplotlib (un marqueur vectoriel par
+# répondant), on compte les points par pixel et par catégorie avec numpy,
+# puis on dessine une seule image. Le temps de rendu et la taille du
+# fichier ne dépendent plus du nombre de répondants.
+
+
+def count_layers(x, y, codes, n_categories, extent, size=400):
+    """Comptages (catégories, size, size) des points par pixel.
+
+    extent = (xmin, xmax, ymin, ymax) ; les points hors cadre sont ignorés,
+    la ligne 0 de chaque couche est en bas (ymin).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    codes = np.asarray(codes)
+    xmin, xmax, ymin, ymax = extent
+    ix = np.floor((x - xmin) / (xmax - xmin) * size).astype(np.int64)
+    iy = np.floor((y - ymin) / (ymax - ymin) * size).astype(np.int64)
+    keep = (ix >= 0) & (ix < size) & (iy >= 0) & (iy < size) & (codes >= 0)
+    cells = size * size
+    flat = codes[keep].astype(np.int64) * cells + iy[keep] * size + ix[keep]
+    return np.bincount(flat, minlength=n_categories * cells).reshape(n_categories, size, size)
+
+
+def layers_to_rgba(layers, colors):
+    """Image RGBA : couleur moyenne des catégories présentes dans chaque
+    pixel, opacité croissante (log) avec le nombre de points."""
+    colors = np.asarray(colors, dtype=float)[:, :3]
+    total = layers.sum(axis=0)
+    rgb = np.tensordot(layers, colors, axes=(0, 0)) / np.maximum(total, 1)[..., None]
+    alpha = np.zeros(total.shape)
+    if total.max() > 0:
+        alpha = np.where(total > 0, 0.35 + 0.65 * np.log1p(total) / np.log1p(total.max()), 0)
+    return np.dstack([rgb, alpha])
+
+
+def draw_raster(ax, x, y, codes, colors, extent=None, size=400, zorder=0):
+    """Dessine le nuage (x, y) comme une image, sous les autres éléments.
+
+    colors[k] est la couleur de la catégorie de code k.
+    """
+    if extent is None:
+        extent = (np.nanmin(x), np.nanmax(x), np.nanmin(y), np.nanmax(y))
+        # Le point maximal doit tomber dans le dernier pixel
+        dx, dy = (extent[1] - extent[0]) or 1, (extent[3] - extent[2]) or 1
+        extent = (extent[0], extent[0] + dx * (1 + 1e-9), extent[2], extent[2] + dy * (1 + 1e-9))
+    layers = count_layers(x, y, codes, len(colors), extent, size)
+    ax.imshow(layers_to_rgba(layers, colors), extent=extent, origin="lower",
+              interpolation="nearest", aspect="auto", zorder=zorder)
+    return ax
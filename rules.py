@@ -0,0 +1,169 @@
+import json
+import os
+import re
+from collections import deque
+
+from fuzzy import compile_matcher
+
+# =============================================================
+# Règles de normalisation déclaratives (rules.json)
+# =============================================================
+# Chaque jeu de règles ("genre", "platform", ...) est une liste de règles
+# avec une priorité (la plus petite gagne) et une valeur de sortie. Une
+# règle peut combiner plusieurs types de motifs :
+#   "exact"     : le token vaut exactement le motif
+#   "prefix"    : le token commence par le motif
+#   "substring" : le token contient le motif
+#   "regex"     : re.search(motif, token)
+# "default" indique quoi faire d'un token sans règle : "keep" le garde tel
+# quel, "drop" le supprime. Avec "fuzzy": {"threshold": 0.8}, un token sans
+# règle prend d'abord la valeur du motif le plus proche, sans tenir compte
+# des accents ("teckno" -> "techno", voir fuzzy.py).
+#
+# Le fichier est compilé une seule fois : les motifs exacts vont dans un
+# dictionnaire, les préfixes et sous-chaînes dans un unique automate
+# d'Aho-Corasick. Une recherche coûte donc O(longueur du token) quel que
+# soit le nombre de règles ; seules les regex sont testées une à une.
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+
+# -------------------------------------------------------------
+# Automate d'Aho-Corasick
+# -------------------------------------------------------------
+def build_automaton(patterns):
+    """Construit un automate pour une liste de (motif, donnée).
+
+    Renvoie (transitions, sorties) : transitions[état] est un dict
+    caractère -> état, sorties[état] la liste des (longueur, donnée) des
+    motifs qui se terminent dans cet état.
+    """
+    goto = [{}]
+    outputs = [[]]
+    for pattern, payload in patterns:
+        state = 0
+        for char in pattern:
+            if char not in goto[state]:
+                goto.append({})
+                outputs.append([])
+                goto[state][char] = len(goto) - 1
+            state = goto[state][char]
+        outputs[state].append((len(pattern), payload))
+
+    # Liens d'échec par parcours en largeur
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, child in goto[state].items():
+            queue.append(child)
+            target = fail[state]
+            while target and char not in goto[target]:
+                target = fail[target]
+            fail[child] = goto[target].get(char, 0)
+            outputs[child] = outputs[child] + outputs[fail[child]]
+
+    # Transitions complètes : plus de retour arrière pendant la recherche
+    transitions = [dict() for _ in goto]
+    order = deque([0])
+    while order:
+        state = order.popleft()
+        if state:
+            transitions[state] = dict(transitions[fail[state]])
+        transitions[state].update(goto[state])
+        order.extend(goto[state].values())
+    return transitions, outputs
+
+
+def iter_matches(automaton, text):
+    """Renvoie les (début, donnée) de tous les motifs trouvés dans text."""
+    transitions, outputs = automaton
+    state = 0
+    for end, char in enumerate(text):
+        state = transitions[state].get(char, 0)
+        for length, payload in outputs[state]:
+            yield end - length + 1, payload
+
+
+# -------------------------------------------------------------
+# Compilation d'un jeu de règles
+# -------------------------------------------------------------
+def compile_ruleset(spec):
+    """Compile un jeu de règles en une fonction token -> token normalisé."""
+    exact = {}
+    patterns = []
+    regexes = []
+    vocabulary = []
+    for rule in spec["rules"]:
+        hit = (rule["priority"], rule["value"])
+        vocabulary.append((rule["value"],) + hit)
+        for kind in ("exact", "prefix", "substring"):
+            vocabulary += [(pattern,) + hit for pattern in rule.get(kind, [])]
+        for pattern in rule.get("exact", []):
+            # Premier arrivé / plus prioritaire gagne, comme dans l'ancien if/elif
+            if pattern not in exact or hit[0] < exact[pattern][0]:
+                exact[pattern] = hit
+        for pattern in rule.get("prefix", []):
+            patterns.append((pattern, (True,) + hit))
+        for pattern in rule.get("substring", []):
+            patterns.append((pattern, (False,) + hit))
+        for pattern in rule.get("regex", []):
+            regexes.append((re.compile(pattern),) + hit)
+    regexes.sort(key=lambda r: r[1])
+    automaton = build_automaton(patterns) if patterns else None
+    keep = spec.get("default", "keep") == "keep"
+    fuzzy = compile_matcher(vocabulary, **spec["fuzzy"]) if "fuzzy" in spec else None
+
+    def normalize(g):
+        if not isinstance(g, str):
+            return None
+        g = g.lower().strip()
+
+        best = exact.get(g)
+        if automaton is not None:
+            for start, (prefix_only, priority, value) in iter_matches(automaton, g):
+                if prefix_only and start != 0:
+                    continue
+                if best is None or priority < best[0]:
+                    best = (priority, value)
+        for regex, priority, value in regexes:
+            if best is not None and best[0] <= priority:
+                break
+            if regex.search(g):
+                best = (priority, value)
+                break
+
+        if best is not None:
+            return best[1]
+        if fuzzy is not None:
+            value = fuzzy(g)
+            if value is not None:
+                return value
+        return g if keep else None
+
+    return normalize
+
+
+def compile_token_filter(motifs):
+    """Renvoie une fonction token -> True si le token contient un des motifs
+    (sans tenir compte de la casse), via un seul automate."""
+    automaton = build_automaton([(m.lower(), m) for m in motifs])
+
+    def matches(g):
+        if not isinstance(g, str):
+            return False
+        return next(iter_matches(automaton, g.lower()), None) is not None
+
+    return matches
+
+
+def load_rule_specs(path=RULES_PATH):
+    # Contenu brut de rules.json : {nom du jeu de règles: spécification}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_rules(path=RULES_PATH, specs=None):
+    """Charge rules.json et renvoie {nom du jeu de règles: fonction}."""
+    specs = load_rule_specs(path) if specs is None else specs
+    return {name: compile_ruleset(spec) for name, spec in specs.items()}
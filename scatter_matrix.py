@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+# =============================================================
+# Matrice de nuages de points "binnée" (remplace sns.pairplot)
+# =============================================================
+# Au lieu de dessiner chaque point dans chaque paire de colonnes, on
+# compte les points par case : histogrammes 2D hors diagonale,
+# histogrammes 1D sur la diagonale. Le coût du dessin ne dépend plus du
+# nombre de lignes.
+#
+# Calcul en une passe : chaque valeur est remplacée une fois par son numéro
+# de case, puis chaque paire n'est plus qu'un np.bincount sur des entiers.
+
+
+def column_edges(values, bins=20):
+    """Bornes des cases d'une colonne. Quand la colonne a peu de valeurs
+    distinctes (échelles 1–5, tempo 60–180), une case par valeur."""
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return np.array([0.0, 1.0])
+    distinct = np.sort(pd.unique(values))
+    if len(distinct) == 1:
+        return np.array([distinct[0] - 0.5, distinct[0] + 0.5])
+    if len(distinct) <= bins:
+        middles = (distinct[1:] + distinct[:-1]) / 2
+        first = distinct[0] - (middles[0] - distinct[0])
+        last = distinct[-1] + (distinct[-1] - middles[-1])
+        return np.concatenate([[first], middles, [last]])
+    return np.linspace(distinct[0], distinct[-1], bins + 1)
+
+
+def binned_counts(data, bins=20):
+    """Renvoie (bornes par colonne, comptages).
+
+    comptages[i][j] est l'histogramme 2D des colonnes i (lignes) et j
+    (colonnes) ; comptages[i][i] l'histogramme 1D de la colonne i. Les
+    valeurs manquantes sont ignorées paire par paire.
+    """
+    x = np.asarray(data, dtype=float)
+    n_cols = x.shape[1]
+    edges = [column_edges(x[:, j], bins) for j in range(n_cols)]
+    sizes = [len(e) - 1 for e in edges]
+
+    # Une seule passe sur les données : numéro de case de chaque valeur,
+    # les valeurs manquantes vont dans une case supplémentaire (la dernière)
+    codes = []
+    for j, e in enumerate(edges):
+        code = np.clip(np.searchsorted(e, x[:, j], side="right") - 1, 0, sizes[j] - 1).astype(np.int32)
+        code[np.isnan(x[:, j])] = sizes[j]
+        codes.append(code)
+
+    # Ensuite uniquement des comptages entiers (bincount) par paire, sans
+    # masque : la case des manquants est retirée à la fin
+    counts = [[None] * n_cols for _ in range(n_cols)]
+    for i in range(n_cols):
+        counts[i][i] = np.bincount(codes[i], minlength=sizes[i] + 1)[:-1]
+        for j in range(i + 1, n_cols):
+            width = sizes[j] + 1
+            pair = np.bincount(codes[i] * width + codes[j], minlength=(sizes[i] + 1) * width)
+            counts[i][j] = pair.reshape(sizes[i] + 1, width)[:-1, :-1]
+            counts[j][i] = counts[i][j].T
+    return edges, counts
+
+
+def plot_binned_scatter_matrix(data, bins=20, cmap="viridis"):
+    """Dessine la matrice de nuages binnée d'un DataFrame et renvoie la figure."""
+    edges, counts = binned_counts(data, bins)
+    return draw_binned_scatter_matrix(list(data.columns), edges, counts, cmap)
+
+
+def draw_binned_scatter_matrix(columns, edges, counts, cmap="viridis"):
+    """Dessine la matrice à partir des comptages de binned_counts (rien
+    qui dépende du nombre de lignes) et renvoie la figure."""
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    p = len(columns)
+    fig, axes = plt.subplots(p, p, figsize=(2 * p, 2 * p), squeeze=False)
+    for i in range(p):
+        for j in range(p):
+            ax = axes[i][j]
+            if i == j:
+                ax.stairs(counts[i][i], edges[i], fill=True)
+            else:
+                grid = counts[i][j].astype(float)
+                grid[grid == 0] = np.nan
+                # Lignes = colonne i (axe y), colonnes = colonne j (axe x)
+                ax.pcolormesh(edges[j], edges[i], grid, cmap=cmap,
+                              norm=LogNorm(vmin=1, vmax=max(np.nanmax(grid), 1)) if np.any(grid > 0) else None)
+            if i == p - 1:
+                ax.set_xlabel(columns[j])
+            else:
+                ax.set_xticklabels([])
+            if j == 0:
+                ax.set_ylabel(columns[i])
+            else:
+                ax.set_yticklabels([])
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,279 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+# =============================================================
+# Schéma typé des données nettoyées
+# =============================================================
+# Utilisé pour l'export colonnaire (cleaned_data.parquet) :
+#   "category" : réponses fermées (une seule valeur)
+#   "Int8"     : échelles 1–5 et fréquences codées, entiers nullables
+#   "float64"  : âge et tempo
+#   "string"   : réponses multiples "a;b;c" et texte libre
+
+COLUMN_TYPES = {
+    "instrumental or vocal music": "category",
+    "platform listening": "string",
+    "radio station": "string",
+    "music style": "string",
+    "musical period": "string",
+    "language listening": "string",
+    "type of singing": "category",
+    "frequency listening of emerging artist": "Int8",
+    "tempo": "float64",
+    "frequency during working": "Int8",
+    "frequency during exercising": "Int8",
+    "frequency during cooking": "Int8",
+    "frequency during driving": "Int8",
+    "frequency for passing the time": "Int8",
+    "monthly listening frequency": "Int8",
+    "daily listening frequency": "Int8",
+    "gender": "category",
+    "age": "float64",
+    "environment": "category",
+    "professional situation": "category",
+}
+
+
+# -------------------------------------------------------------
+# Représentation compacte en mémoire (DataFrame renvoyé par data_clean)
+# -------------------------------------------------------------
+#   réponses fermées        : Categorical, ensemble fixe ENUM_CATEGORIES
+#                             (+ valeurs imprévues ajoutées à la suite)
+#   réponses "a;b;c", radio : Categorical, catégories = cellules distinctes
+#   échelles, fréquences    : Int8 nullable
+#   tempo                   : float32 (valeurs exactes en 32 bits)
+#   âge                     : float64 (la moyenne imputée garde sa précision)
+# Les valeurs écrites dans le CSV ne changent pas. Seul leur format devient
+# fixe : une échelle s'écrit "5" et un tempo "150.0", que read_csv ait
+# deviné des entiers ou des flottants (valeurs manquantes) pour le morceau.
+ENUM_CATEGORIES = {
+    "instrumental or vocal music": ["instrumental music", "vocal music", "both"],
+    "type of singing": ["doesn't matter", "engaged", "poetic", "humorous", "prefer not to answer"],
+    "gender": ["woman", "man", "non-binary", "prefer not to answer"],
+    "environment": ["suburb", "city", "countryside", "prefer not to answer"],
+    "professional situation": ["unemployed", "student", "employee", "self-employed", "retired",
+                               "prefer not to answer"],
+}
+
+COMPACT_TYPES = dict(COLUMN_TYPES, **{"tempo": "float32", "platform listening": "category",
+                                      "radio station": "category", "music style": "category",
+                                      "musical period": "category", "language listening": "category"})
+
+
+def distinct_to_categorical(values, codes, series, categories=None):
+    """Colonne catégorielle à partir des valeurs distinctes déjà traitées.
+
+    values[i] est la valeur des lignes de code i (dernière position : code
+    -1, valeur manquante) : seuls les codes sont recalculés, jamais les
+    chaînes des lignes. Les catégories sont `categories` (ensemble fixe,
+    dans cet ordre) suivies des autres valeurs rencontrées, triées.
+    """
+    value_codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    order = list(categories or [])
+    known = set(order)
+    order += sorted((u for u in uniques if u not in known), key=str)
+    position = {c: i for i, c in enumerate(order)}
+    # -1 (valeur manquante) reste -1
+    remap = np.array([position[u] for u in uniques] + [-1], dtype=np.int32)
+    result = pd.Categorical.from_codes(remap[value_codes][codes], order)
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def compact_column(series, kind):
+    """Convertit une colonne dans le type compact `kind` si ses valeurs le
+    permettent sans perte ; sinon (ex. texte dans une échelle) la renvoie
+    telle quelle. Les valeurs ne sont vérifiées et converties qu'une fois
+    par valeur distincte."""
+    if kind == "category":
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series
+        codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+        return distinct_to_categorical(list(uniques) + [np.nan], codes, series, ENUM_CATEGORIES.get(series.name))
+    if str(series.dtype) == kind:
+        return series
+    codes, uniques = pd.factorize(series)
+    if pd.api.types.infer_dtype(uniques, skipna=True) not in ("integer", "floating", "mixed-integer-float", "empty"):
+        return series
+    values = np.append(pd.to_numeric(pd.Series(uniques, dtype=object)).to_numpy(dtype="float64"), np.nan)
+    known = values[:-1][~np.isnan(values[:-1])]
+    if kind == "Int8":
+        if (known % 1 != 0).any() or (np.abs(known) > 127).any():
+            return series
+        missing = np.isnan(values)
+        result = pd.arrays.IntegerArray(np.where(missing, 0, values).astype(np.int8)[codes], missing[codes])
+    elif kind == "float32":
+        if (known.astype(np.float32).astype(np.float64) != known).any():
+            return series
+        result = values.astype(np.float32)[codes]
+    else:
+        return series
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def to_compact(data):
+    """Applique COMPACT_TYPES aux colonnes du DataFrame nettoyé (sur place)."""
+    for col in data.columns:
+        kind = COMPACT_TYPES.get(col)
+        if kind is not None and kind != "float64":
+            data[col] = compact_column(data[col], kind)
+    return data
+
+
+def typed_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def to_typed(data):
+    """Convertit le DataFrame nettoyé selon COLUMN_TYPES."""
+    typed = {}
+    for col, kind in COLUMN_TYPES.items():
+        if kind == "Int8" or kind == "float64":
+            typed[col] = pd.to_numeric(data[col], errors="coerce").astype(kind)
+        elif kind == "category":
+            typed[col] = data[col].astype("category")
+        else:
+            typed[col] = data[col].astype("object")
+    return pd.DataFrame(typed, index=data.index)
+
+
+def arrow_schema():
+    import pyarrow as pa
+
+    types = {
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "Int8": pa.int8(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+    }
+    return pa.schema([(col, types[kind]) for col, kind in COLUMN_TYPES.items()])
+
+
+# -------------------------------------------------------------
+# Fichiers en plusieurs parties (mode incrémental)
+# -------------------------------------------------------------
+# Les nouvelles réponses sont écrites dans une partie à côté du fichier
+# principal (cleaned_data.part1.parquet, cleaned_data.music_style.part1.npz,
+# ...) au lieu de réécrire tout le fichier. Une reconstruction complète
+# réécrit le fichier principal et supprime les parties.
+def part_paths(path):
+    """`path` suivi de ses parties (path.part1, path.part2...), dans l'ordre."""
+    root, ext = os.path.splitext(path)
+    prefix = root + ".part"
+    numbers = [p[len(prefix):len(p) - len(ext)] for p in glob.glob(glob.escape(prefix) + "*" + ext)]
+    parts = [f"{prefix}{n}{ext}" for n in sorted((n for n in numbers if n.isdigit()), key=int)]
+    return ([path] if os.path.exists(path) else []) + parts
+
+
+def next_part_path(path):
+    # Fichier principal s'il n'existe pas encore, sinon partie suivante
+    n_parts = len(part_paths(path))
+    if not n_parts:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.part{n_parts}{ext}"
+
+
+def remove_parts(path, keep_main=True):
+    for part in part_paths(path)[1 if keep_main else 0:]:
+        os.remove(part)
+
+
+# -------------------------------------------------------------
+# Export Parquet typé
+# -------------------------------------------------------------
+ROW_GROUP_SIZE = 100_000   # lignes par groupe : relecture partielle possible
+
+
+def remove_typed(csv_path):
+    # Export typé impossible : on supprime les anciens fichiers, qui ne
+    # correspondraient plus au CSV
+    paths = part_paths(typed_path(csv_path))
+    remove_parts(typed_path(csv_path), keep_main=False)
+    if paths:
+        print(f"{typed_path(csv_path)} supprimé (plus à jour)")
+
+
+def has_typed_export():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def open_typed_writer(csv_path, append=False):
+    """Ouvre un écrivain Parquet pour écrire le fichier morceau par morceau.
+
+    Avec append=True, les lignes vont dans une nouvelle partie ; sinon le
+    fichier principal est réécrit. Renvoie None si pyarrow n'est pas
+    installé.
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow n'est pas installé : pas d'export Parquet")
+        remove_typed(csv_path)
+        return None
+    if append:
+        return pq.ParquetWriter(next_part_path(typed_path(csv_path)), arrow_schema())
+    remove_parts(typed_path(csv_path))
+    return pq.ParquetWriter(typed_path(csv_path), arrow_schema())
+
+
+def write_typed(writer, data):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(to_typed(data), schema=arrow_schema(), preserve_index=False)
+    writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+
+
+def export_typed(data, csv_path):
+    writer = open_typed_writer(csv_path)
+    if writer is not None:
+        write_typed(writer, data)
+        writer.close()
+
+
+def is_stale(paths, csv_path):
+    # Parquet plus ancien que le CSV : écrit avant la dernière écriture du CSV
+    return os.path.exists(csv_path) and max(map(os.path.getmtime, paths)) < os.path.getmtime(csv_path)
+
+
+def load_cleaned(columns=None, csv_path="cleaned_data.csv", start=0):
+    """Charge les données nettoyées en ne lisant que `columns`, à partir
+    de la ligne `start` (index conservé : start, start + 1...).
+
+    Lit le fichier Parquet typé (et ses parties) s'il existe et n'est pas
+    plus ancien que le CSV (ex. CSV réécrit par main.py), sinon le CSV.
+    En Parquet, seuls les groupes de lignes à partir de `start` sont lus.
+    """
+    paths = part_paths(typed_path(csv_path))
+    if paths and not is_stale(paths, csv_path):
+        data = _read_typed(paths, columns, start)
+    else:
+        data = pd.read_csv(csv_path, usecols=columns)
+        data = to_typed(data.reindex(columns=list(COLUMN_TYPES)))[data.columns].iloc[start:]
+    data.index = pd.RangeIndex(start, start + len(data))
+    return data
+
+
+def _read_typed(paths, columns, start):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tables, row = [], 0
+    for path in paths:
+        f = pq.ParquetFile(path)
+        for group in range(f.num_row_groups):
+            n_rows = f.metadata.row_group(group).num_rows
+            if row + n_rows > start:
+                table = f.read_row_group(group, columns=columns)
+                tables.append(table.slice(max(0, start - row)))
+            row += n_rows
+    if not tables:
+        empty = pq.ParquetFile(paths[0]).schema_arrow.empty_table()
+        tables = [empty if columns is None else empty.select(columns)]
+    return pa.concat_tables(tables).to_pandas()
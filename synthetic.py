@@ -0,0 +1,239 @@
+import csv
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from ingest import TIMESTAMP_HEADER, match_headers
+
+# =============================================================
+# Générateur de réponses synthétiques (mêmes 29 colonnes que raw_data.csv)
+# =============================================================
+# Les distributions viennent de raw_data.csv :
+#   - questions à choix unique, échelles, âge : tirage selon les fréquences
+#     observées (réponses manquantes comprises) ;
+#   - cases à cocher "a;b;c" : chaque option est cochée avec sa fréquence
+#     observée, dans l'ordre du formulaire, plus parfois un texte libre
+#     "Autre" (réponses réelles + exemples ci-dessous), abîmé au hasard :
+#     accents, casse, espaces, séparateurs "," "/" et fautes ("tekno",
+#     "you tube"...).
+# Les cellules à cocher sont tirées dans un réservoir de cellules
+# distinctes : le coût Python ne dépend que de la taille du réservoir,
+# le reste est du numpy.
+#   python cli.py generate N [--output synthetic_raw.csv] [--seed S]
+
+RAW_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "raw_data.csv")
+
+# Colonnes de l'export, par nom (voir ingest.match_headers : nom de
+# RAW_SCHEMA ou en-tête de l'export)
+RECOMMENDATION_CRITERIA = "Quels critères sont importants pour vous dans une recommandation ?"
+CHECKBOX_COLUMNS = ["platform listening", "radio station", "music style", "musical period",
+                    "language listening", RECOMMENDATION_CRITERIA]
+TIMESTAMP_COLUMN = TIMESTAMP_HEADER
+USERNAME_COLUMN = "Nom d'utilisateur"
+AGE_COLUMN = "age"
+
+# Une option doit apparaître au moins MIN_OPTION_COUNT fois pour être une
+# case du formulaire ; les autres réponses sont du texte libre
+MIN_OPTION_COUNT = 3
+
+# Textes libres supplémentaires ("Autre : ..."), par colonne
+EXTRA_FREE_TEXT = {
+    "platform listening": ["you tube", "Youtube premium", "Spotify", "deezer", "Soundcloud", "Clé USB",
+        "cassettes", "Apple music", "concerts", "télé / clips", "mp3, téléchargement"],
+    "radio station": ["Rire & chansons", "rtl 2, fip", "Chérie FM", "France Inter / France Culture", "skyrock",
+        "nrj, fun radio", "Radio Nova", "Mouv'", "Hit West", "aucune", "radio locale"],
+    "music style": ["Drum and bass, house", "hip hop / rnb", "Tekno", "k-pop", "reggaeton", "Métal et ses dérivés",
+        "zouk, kompa", "Jazz manouche", "musique de films", "rock progressif / psyché", "Afro, dancehall",
+        "Hardtek", "lofi", "gospel", "Variété française", "hardstyle", "Electro swing", "chanson française"],
+    "musical period": ["Je ne sais pas", "toutes les époques"],
+    "language listening": ["Italien", "Portugais", "Japonais", "arabe", "breton, scandinave", "un peu de tout"],
+    RECOMMENDATION_CRITERIA: ["Les paroles", "la popularité / les tendances"],
+}
+
+# Fautes courantes (recherchées sans tenir compte de la casse). Certaines
+# sont trop loin de tout motif de rules.json pour être rapprochées
+# ("spotyfi" : voir fuzzy.py) et restent telles quelles dans la sortie.
+TYPOS = {
+    "techno": ["tekno", "teckno"],
+    "youtube": ["you tube", "you-tube", "ytb"],
+    "électro": ["electro", "éléctro", "elektro"],
+    "hip hop": ["hip-hop", "hiphop"],
+    "variété": ["variete", "varièté"],
+    "classique": ["clasique"],
+    "spotify": ["spotyfi"],
+    "chansons": ["chanson"],
+    "radio": ["raddio"],
+}
+
+
+def _strip_accents(text):
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def mess_up(text, rng, rate=0.5):
+    """Abîme un texte libre comme le ferait un répondant pressé."""
+    if rng.random() < rate:
+        low = text.lower()
+        for word, typos in TYPOS.items():
+            if word in low:
+                i = low.index(word)
+                text = text[:i] + typos[rng.integers(len(typos))] + text[i + len(word):]
+                low = text.lower()
+    if rng.random() < rate * 0.3:
+        text = _strip_accents(text)
+    case = rng.random()
+    if case < rate * 0.3:
+        text = text.lower()
+    elif case < rate * 0.4:
+        text = text.upper()
+    elif case < rate * 0.5:
+        text = text.title()
+    if rng.random() < rate * 0.3:
+        sep = [", ", ",", " / ", "/", " , "][rng.integers(5)]
+        text = text.replace(", ", sep).replace(" / ", sep)
+    if rng.random() < rate * 0.4:
+        text = text + " "
+    return text
+
+
+def _option_key(label):
+    # "CD / DVD / Vinyles" et "CD / DVD /vinyles" : la même case du formulaire
+    return label.lower().replace(" ", "")
+
+
+def checkbox_model(cells):
+    """Options du formulaire (dans l'ordre), probabilité de chacune, textes
+    libres observés et probabilité d'un texte libre.
+
+    Chaque option est une liste [(libellé, poids)] : les variantes d'un même
+    libellé (anciennes versions du formulaire) sont regroupées.
+    """
+    split = cells.dropna().str.split(";")
+    tokens = split.explode()
+    counts = tokens[tokens.str.strip() != ""].value_counts()
+    frequent = counts[counts >= MIN_OPTION_COUNT]
+    groups = {}
+    for label, count in frequent.items():
+        groups.setdefault(_option_key(label), []).append((label, count))
+    # Ordre du formulaire : position moyenne de l'option dans les cellules
+    positions = {key: [] for key in groups}
+    for parts in split:
+        for i, t in enumerate(parts):
+            if _option_key(t) in positions and t in frequent.index:
+                positions[_option_key(t)].append(i / max(len(parts) - 1, 1))
+    keys = sorted(groups, key=lambda key: np.mean(positions[key]))
+    n = len(split)
+    options = [groups[key] for key in keys]
+    probs = np.array([min(sum(c for _, c in groups[key]) / n, 1.0) for key in keys])
+    free = [t for t in counts.index if t not in frequent.index]
+    p_free = split.map(lambda parts: any(t.strip() and t not in frequent.index for t in parts)).mean()
+    return options, probs, free, p_free
+
+
+def _pick_label(variants, rng):
+    if len(variants) == 1:
+        return variants[0][0]
+    weights = np.array([c for _, c in variants], dtype=float)
+    return variants[rng.choice(len(variants), p=weights / weights.sum())][0]
+
+
+def checkbox_pool(model, extra, size, rng):
+    # Réservoir de `size` cellules "a;b;c" distinctes ou non
+    options, probs, free, p_free = model
+    free = list(free) + list(extra)
+    picks = rng.random((size, len(options))) < probs
+    with_free = rng.random(size) < p_free
+    empty = ~picks.any(axis=1) & ~with_free
+    picks[empty, rng.choice(len(options), empty.sum(), p=probs / probs.sum())] = True
+    cells = []
+    for row, add_free in zip(picks, with_free):
+        parts = [_pick_label(o, rng) for o, p in zip(options, row) if p]
+        if add_free:
+            parts.append(mess_up(free[rng.integers(len(free))], rng))
+        if rng.random() < 0.01:
+            parts.append("")
+        cells.append(";".join(parts))
+    return np.array(cells, dtype=object)
+
+
+def empirical(values, n, rng):
+    # Tirage selon les fréquences observées (NaN compris)
+    counts = values.value_counts(dropna=False)
+    return counts.index.to_numpy(dtype=object)[rng.choice(len(counts), n, p=(counts / counts.sum()).to_numpy())]
+
+
+def username_pool(size, rng):
+    first = ["lea", "hugo", "emma", "lucas", "chloe", "louis", "ines", "jules", "manon", "nathan", "sarah", "yanis"]
+    last = ["martin", "bernard", "dubois", "thomas", "robert", "richard", "petit", "durand", "leroy", "moreau"]
+    domains = ["gmail.com", "hotmail.fr", "yahoo.fr", "orange.fr", "etu.univ.fr"]
+    return np.array([f"{first[rng.integers(len(first))]}{['', '.', '_'][rng.integers(3)]}"
+                     f"{last[rng.integers(len(last))]}{rng.integers(1, 9999)}@{domains[rng.integers(len(domains))]}"
+                     for _ in range(size)], dtype=object)
+
+
+def timestamps(n, rng, start="2025-10-06", days=30):
+    # Format de l'export du formulaire : "2025/10/06 8:30:41 AM UTC+1",
+    # assemblé à partir de tables de chaînes (pas de strftime par ligne)
+    seconds = np.sort(rng.integers(0, days * 24 * 3600, n))
+    day, rest = np.divmod(seconds, 24 * 3600)
+    hour, rest = np.divmod(rest, 3600)
+    minute, second = np.divmod(rest, 60)
+    dates = np.array([d.strftime("%Y/%m/%d ") for d in pd.date_range(start, periods=days)], dtype=object)
+    hours = np.array([str(h % 12 or 12) for h in range(24)], dtype=object)
+    suffix = np.array([" AM UTC+1"] * 12 + [" PM UTC+1"] * 12, dtype=object)
+    two = np.array([f":{i:02d}" for i in range(60)], dtype=object)
+    return dates[day] + hours[hour] + two[minute] + two[second] + suffix[hour]
+
+
+def survey_model(raw_path=RAW_PATH):
+    """Distributions apprises une fois sur l'export réel."""
+    raw = pd.read_csv(raw_path, dtype=object, keep_default_na=False, na_values=[""])
+    headers = match_headers(list(raw.columns), CHECKBOX_COLUMNS + [TIMESTAMP_COLUMN, USERNAME_COLUMN, AGE_COLUMN])
+    return {
+        "columns": list(raw.columns),
+        "headers": headers,
+        "raw": raw,
+        "checkbox": {headers[name]: checkbox_model(raw[headers[name]]) for name in CHECKBOX_COLUMNS},
+        "extra": {headers[name]: texts for name, texts in EXTRA_FREE_TEXT.items()},
+        "username_missing": raw[headers[USERNAME_COLUMN]].isna().mean(),
+    }
+
+
+def generate_survey(n_rows, seed=0, model=None, pool_size=20_000):
+    """DataFrame de n_rows réponses synthétiques avec les en-têtes de raw_data.csv."""
+    model = model or survey_model()
+    rng = np.random.default_rng(seed)
+    raw, headers = model["raw"], model["headers"]
+    pool_size = min(pool_size, n_rows)
+    data = {}
+    for col in model["columns"]:
+        if col == headers[TIMESTAMP_COLUMN]:
+            data[col] = timestamps(n_rows, rng)
+        elif col == headers[USERNAME_COLUMN]:
+            names = username_pool(pool_size, rng)[rng.integers(0, pool_size, n_rows)]
+            names[rng.random(n_rows) < model["username_missing"]] = None
+            data[col] = names
+        elif col in model["checkbox"]:
+            pool = checkbox_pool(model["checkbox"][col], model["extra"].get(col, []), pool_size, rng)
+            cells = pool[rng.integers(0, pool_size, n_rows)]
+            cells[rng.random(n_rows) < raw[col].isna().mean()] = None
+            data[col] = cells
+        elif col == headers[AGE_COLUMN]:
+            ages = pd.to_numeric(pd.Series(empirical(raw[col], n_rows, rng)), errors="coerce")
+            ages = (ages + rng.integers(-2, 3, n_rows)).clip(lower=12)
+            data[col] = ages.astype("Int64").astype(object).where(ages.notna(), None).to_numpy()
+        else:
+            data[col] = empirical(raw[col], n_rows, rng)
+    return pd.DataFrame(data)
+
+
+def write_survey(path, n_rows, seed=0, chunksize=500_000):
+    """Écrit n_rows réponses dans `path`, morceau par morceau (mémoire bornée)."""
+    model = survey_model()
+    for k, start in enumerate(range(0, n_rows, chunksize)):
+        chunk = generate_survey(min(chunksize, n_rows - start), seed=seed + k, model=model)
+        chunk.to_csv(path, mode="w" if k == 0 else "a", header=(k == 0), index=False, quoting=csv.QUOTE_ALL)
+    print(f"{path} created successfully ✅ ({n_rows} lignes)")
+    return path
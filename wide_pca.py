@@ -0,0 +1,92 @@
+import numpy as np
+from scipy import sparse
+
+from multihot import current_multihot
+
+# =============================================================
+# ACP sur une matrice large et creuse
+# =============================================================
+# Variables quantitatives + indicatrices multi-hot (genres, plateformes,
+# langues, radios) : des milliers de colonnes presque toutes nulles.
+# La matrice n'est jamais centrée explicitement (ce qui la rendrait
+# dense) : le centrage et la réduction sont appliqués à la volée dans les
+# produits matriciels d'une SVD randomisée (Halko et al.).
+
+WIDE_MULTIHOT_COLUMNS = ["music style", "platform listening", "language listening", "radio station"]
+
+
+def build_wide_matrix(quant, csv_path="cleaned_data.csv", columns=WIDE_MULTIHOT_COLUMNS):
+    """Assemble [quantitatives | indicatrices] en CSR.
+
+    `quant` est le DataFrame des variables quantitatives, indexé comme les
+    lignes du CSV nettoyé (après dropna éventuel) : on ne garde que ces
+    lignes dans les matrices multi-hot (réencodées du CSV si les .npz sont
+    plus anciens). Renvoie (matrice, noms des colonnes).
+    """
+    rows = quant.index.to_numpy()
+    blocks = [sparse.csr_matrix(quant.to_numpy(dtype=float))]
+    names = list(quant.columns)
+    for col in columns:
+        matrix, vocabulary = current_multihot(csv_path, col)
+        blocks.append(matrix[rows].astype(float))
+        names += [f"{col}={v}" for v in vocabulary]
+    return sparse.hstack(blocks, format="csr"), names
+
+
+def column_stats(x):
+    # Moyenne et écart-type (ddof=1) de chaque colonne, sans densifier
+    n = x.shape[0]
+    mean = np.asarray(x.mean(axis=0)).ravel()
+    mean_sq = np.asarray(x.multiply(x).mean(axis=0)).ravel()
+    var = np.maximum(mean_sq - mean ** 2, 0) * n / max(n - 1, 1)
+    return mean, np.sqrt(var)
+
+
+def standard_scale(std):
+    # 1 / écart-type, 0 pour les colonnes constantes
+    return np.where(std > 0, 1 / np.where(std > 0, std, 1), 0.0)
+
+
+def randomized_pca(x, n_components=5, standardize=True, n_oversamples=10, n_iter=7, random_state=0):
+    """ACP de x (creuse) par SVD randomisée avec centrage implicite.
+
+    Renvoie un dict comme les attributs de sklearn.decomposition.PCA :
+    components, explained_variance, explained_variance_ratio, scores.
+    """
+    n, p = x.shape
+    mean, std = column_stats(x)
+    scale = standard_scale(std) if standardize else np.ones(p)
+
+    # A = (X - 1 meanᵀ) diag(scale), jamais construite
+    def a_dot(m):
+        m = scale[:, None] * m
+        return x @ m - (mean @ m)[None, :]
+
+    def a_t_dot(m):
+        return scale[:, None] * (x.T @ m - np.outer(mean, m.sum(axis=0)))
+
+    k = min(n_components + n_oversamples, n, p)
+    rng = np.random.default_rng(random_state)
+    q, _ = np.linalg.qr(a_dot(rng.normal(size=(p, k))))
+    for _ in range(n_iter):
+        z, _ = np.linalg.qr(a_t_dot(q))
+        q, _ = np.linalg.qr(a_dot(z))
+
+    b = a_t_dot(q).T
+    u_b, s, vt = np.linalg.svd(b, full_matrices=False)
+    u = q @ u_b[:, :n_components]
+    s, vt = s[:n_components], vt[:n_components]
+
+    # Signe déterministe : la plus grande contribution de chaque axe est positive
+    signs = np.sign(vt[np.arange(len(vt)), np.abs(vt).argmax(axis=1)])
+    u, vt = u * signs, vt * signs[:, None]
+
+    explained_variance = s ** 2 / (n - 1)
+    total_variance = np.sum((std * scale) ** 2)
+    return {
+        "components": vt,
+        "explained_variance": explained_variance,
+        "explained_variance_ratio": explained_variance / total_variance,
+        "scores": u * s,
+    }
+